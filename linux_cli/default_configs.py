@@ -1,7 +1,10 @@
 easy_configs = {
         "filesystem": {
-            "cramfs_available": "[\"yes\", \"no\"]",
-            "freevxfs_available": "[\"yes\", \"no\"]",
+            "cramfs_available": ["yes", "no"],
+            "freevxfs_available": ["yes", "no"],
+        },
+        "network": {
+            "ip_forward": ["0"],
         }
 }
 
@@ -9,14 +12,32 @@ easy_configs = {
 
 medium_configs = {
         "filesystem": {
-            "cramfs_available": "[\"no\"]",
-            "freevxfs_available": "[\"no\"]",
+            "cramfs_available": ["no"],
+            "freevxfs_available": ["no"],
+        },
+        "mounts": {
+            "tmp_nodev": ["yes"],
+        },
+        "network": {
+            "ip_forward": ["0"],
+            "send_redirects": ["0"],
         }
 }
 
 strong_configs = {
         "filesystem": {
-            "cramfs_available": "[\"no\"]",
-            "freevxfs_available": "[\"no\"]",
+            "cramfs_available": ["no"],
+            "freevxfs_available": ["no"],
+        },
+        "mounts": {
+            "tmp_nodev": ["yes"],
+            "tmp_nosuid": ["yes"],
+        },
+        "network": {
+            "ip_forward": ["0"],
+            "send_redirects": ["0"],
+        },
+        "auditing": {
+            "time_change_audit": ["yes"],
         }
 }
@@ -3,14 +3,66 @@ flags = {
             "cramfs_available": {
                 "value": "yes",
                 "values": ["yes", "no", "unknown"],
+                "check_type": "MODPROBE",
+                "module": "cramfs",
                 "get_command": "",
                 "set_command": "",
                 "default_value": "no"
             },
             "freevxfs_available": {
                 "value": "unknown",
-                "values": ["yes", "no", "unknown"]
+                "values": ["yes", "no", "unknown"],
+                "check_type": "MODPROBE",
+                "module": "freevxfs",
+                "default_value": "no"
             },
 
+        },
+        "mounts": {
+            "tmp_nodev": {
+                "value": "unknown",
+                "values": ["yes", "no", "unknown"],
+                "check_type": "FSTAB_OPTION",
+                "mount_point": "/tmp",
+                "option": "nodev",
+                "default_value": "yes"
+            },
+            "tmp_nosuid": {
+                "value": "unknown",
+                "values": ["yes", "no", "unknown"],
+                "check_type": "FSTAB_OPTION",
+                "mount_point": "/tmp",
+                "option": "nosuid",
+                "default_value": "yes"
+            },
+        },
+        "network": {
+            "ip_forward": {
+                "value": "unknown",
+                "values": ["0", "1", "unknown"],
+                "check_type": "SYSCTL",
+                "key": "net.ipv4.ip_forward",
+                "default_value": "0"
+            },
+            "send_redirects": {
+                "value": "unknown",
+                "values": ["0", "1", "unknown"],
+                "check_type": "SYSCTL",
+                "key": "net.ipv4.conf.all.send_redirects",
+                "default_value": "0"
+            },
+        },
+        "auditing": {
+            "time_change_audit": {
+                "value": "unknown",
+                "values": ["yes", "no", "unknown"],
+                "check_type": "AUDIT_RULE",
+                "rules": [
+                    "-a always,exit -F arch=b64 -S adjtimex -S settimeofday -k time-change",
+                    "-a always,exit -F arch=b32 -S adjtimex -S settimeofday -S stime -k time-change",
+                    "-w /etc/localtime -p wa -k time-change"
+                ],
+                "default_value": "yes"
+            },
         }
 }
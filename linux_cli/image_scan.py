@@ -0,0 +1,174 @@
+import os
+import json
+import hashlib
+import posixpath
+import tarfile
+from concurrent.futures import ProcessPoolExecutor
+
+import linux_engine
+
+# Only files the probes read are kept from each layer; everything else is skipped while streaming
+RELEVANT_PATHS = ("etc/modprobe.d/", "etc/sysctl.d/", "etc/sysctl.conf", "etc/fstab", "etc/audit/")
+# Bump when the cached layer format changes; RELEVANT_PATHS is hashed into the key as well
+LAYER_CACHE_VERSION = 1
+WHITEOUT_PREFIX = ".wh."
+OPAQUE_WHITEOUT = ".wh..wh..opq"
+
+
+class MemoryFS:
+    """Read-only filesystem view over {path: content}, with the same interface as probes.RootFS."""
+
+    def __init__(self, files):
+        self.files = files
+
+    def read(self, path):
+        return self.files.get(path.lstrip("/"))
+
+    def listdir(self, path):
+        prefix = path.strip("/") + "/"
+        return sorted({p[len(prefix):].split("/", 1)[0] for p in self.files if p.startswith(prefix)})
+
+
+def _normalize(name):
+    """'./etc/fstab' and '/etc/fstab' both become 'etc/fstab'."""
+    while name.startswith("./"):
+        name = name[2:]
+    path = posixpath.normpath(name.lstrip("/"))
+    return "" if path == "." else path
+
+
+def _is_relevant(path):
+    return any(path == prefix.rstrip("/") or path.startswith(prefix) for prefix in RELEVANT_PATHS)
+
+
+def _layer_key(name):
+    """Content-addressed id for a layer: the sha256 blob name, or the docker-save layer directory id."""
+    parts = name.strip("/").split("/")
+    if len(parts) >= 2 and parts[-1] == "layer.tar":
+        return parts[-2]
+    return parts[-1]
+
+
+def image_layers(path):
+    """Returns the ordered (layer_key, source) list for an image tarball, docker-save dir or rootfs dir."""
+    if os.path.isdir(path):
+        manifest_path = os.path.join(path, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return [("rootfs:" + os.path.abspath(path), ("rootfs", path, None))]
+        with open(manifest_path, "r") as f:
+            layers = json.load(f)[0]["Layers"]
+        return [(_layer_key(layer), ("file", os.path.join(path, layer), None)) for layer in layers]
+
+    with tarfile.open(path, "r:*") as image:
+        try:
+            manifest = image.extractfile("manifest.json")
+        except KeyError:
+            manifest = None
+        if manifest is None:
+            stat = os.stat(path)
+            key = hashlib.sha256(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime}".encode()).hexdigest()
+            return [(key, ("file", path, None))]
+        layers = json.load(manifest)[0]["Layers"]
+    return [(_layer_key(layer), ("member", path, layer)) for layer in layers]
+
+
+def _read_layer_stream(layer_tar):
+    """Streams one layer tar, keeping relevant files and recording whiteouts."""
+    layer = {"files": {}, "whiteouts": [], "opaque": []}
+    for member in layer_tar:
+        path = _normalize(member.name)
+        directory, base = posixpath.split(path)
+        if base == OPAQUE_WHITEOUT:
+            layer["opaque"].append(directory)
+        elif base.startswith(WHITEOUT_PREFIX):
+            layer["whiteouts"].append(posixpath.join(directory, base[len(WHITEOUT_PREFIX):]))
+        elif member.isfile() and _is_relevant(path):
+            layer["files"][path] = layer_tar.extractfile(member).read().decode("utf-8", errors="replace")
+    return layer
+
+
+def read_layer(source):
+    kind, path, member = source
+    if kind == "rootfs":
+        layer = {"files": {}, "whiteouts": [], "opaque": []}
+        for prefix in RELEVANT_PATHS:
+            full = os.path.join(path, prefix)
+            candidates = [full.rstrip("/")] if not prefix.endswith("/") else [
+                os.path.join(root, name) for root, _, names in os.walk(full) for name in names]
+            for candidate in candidates:
+                if os.path.isfile(candidate):
+                    with open(candidate, "r", errors="replace") as f:
+                        layer["files"][os.path.relpath(candidate, path).replace(os.sep, "/")] = f.read()
+        return layer
+
+    if kind == "file":
+        with tarfile.open(path, "r|*") as layer_tar:
+            return _read_layer_stream(layer_tar)
+
+    # Layer nested inside an image tarball: stream it straight out of the outer archive
+    with tarfile.open(path, "r:*") as image:
+        with tarfile.open(fileobj=image.extractfile(member), mode="r|*") as layer_tar:
+            return _read_layer_stream(layer_tar)
+
+
+def _cache_name(key):
+    """Cache file name for a layer. Changing RELEVANT_PATHS or the format invalidates old entries,
+    since they only hold the files that were relevant when they were written."""
+    marker = json.dumps([LAYER_CACHE_VERSION, RELEVANT_PATHS, key])
+    return hashlib.sha256(marker.encode()).hexdigest() + ".json"
+
+
+def load_layer(job):
+    """Parses one layer, using the on-disk cache shared by all workers and runs when given."""
+    key, source, cache_dir = job
+    # Extracted root directories can change between runs, so only layer tarballs are cached on disk
+    cache_path = None
+    if cache_dir and source[0] != "rootfs":
+        cache_path = os.path.join(cache_dir, _cache_name(key))
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, "r") as f:
+            return key, json.load(f)
+
+    layer = read_layer(source)
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(layer, f)
+        os.replace(temp_path, cache_path)
+    return key, layer
+
+
+def merge_layers(layers):
+    """Applies layers bottom to top, honouring whiteouts and opaque directories."""
+    files = {}
+    for layer in layers:
+        for directory in layer["opaque"]:
+            files = {p: c for p, c in files.items() if not p.startswith(directory + "/")}
+        for removed in layer["whiteouts"]:
+            files = {p: c for p, c in files.items() if p != removed and not p.startswith(removed + "/")}
+        files.update(layer["files"])
+    return files
+
+
+def scan_images(paths, target_config, workers=None, cache_dir=None):
+    """Scans many images. Each distinct layer is parsed once, however many images share it."""
+    images = {path: image_layers(path) for path in paths}
+
+    unique = {}
+    for layers in images.values():
+        for key, source in layers:
+            unique.setdefault(key, source)
+    jobs = [(key, source, cache_dir) for key, source in unique.items()]
+
+    if workers == 1 or len(jobs) <= 1:
+        parsed = dict(load_layer(job) for job in jobs)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = dict(pool.map(load_layer, jobs))
+
+    results = {}
+    for path, layers in images.items():
+        fs = MemoryFS(merge_layers(parsed[key] for key, _ in layers))
+        results[path] = linux_engine.evaluate(target_config, fs)
+    return results
@@ -0,0 +1,306 @@
+import os
+import datetime
+import shutil
+import subprocess
+import tempfile
+
+import flags
+import probes
+
+MODPROBE_FILE = "/etc/modprobe.d/protego.conf"
+SYSCTL_FILE = "/etc/sysctl.d/60-protego.conf"
+SYSCTL_CONF_FILE = "/etc/sysctl.conf"  # applied after every drop-in
+AUDIT_RULES_FILE = "/etc/audit/rules.d/protego.rules"
+FSTAB_FILE = "/etc/fstab"
+BACKUP_DIR = "/var/lib/protego/backups"
+
+
+def iter_config(target_config):
+    """Yields (name, flag_data, allowed_values) for every parameter in a level config."""
+    for category, parameters in target_config.items():
+        for name, allowed in parameters.items():
+            flag_data = flags.flags.get(category, {}).get(name)
+            if flag_data:
+                yield name, flag_data, allowed
+
+
+def evaluate(target_config, fs):
+    """Checks every parameter of a level against a filesystem view. All probes share one file cache."""
+    entries = [(name, flag_data) for name, flag_data, _ in iter_config(target_config)]
+    values = probes.read_parameters(entries, fs)
+    results = []
+    for name, flag_data, allowed in iter_config(target_config):
+        current = values[name]
+        results.append({
+            "parameter": name,
+            "status": "COMPLIANT" if current in allowed else "NON-COMPLIANT",
+            "current": current,
+            "allowed": allowed
+        })
+    return results
+
+
+def enforced_targets(target_config):
+    """Parameters the level actually restricts, with the value to enforce for each."""
+    targets = []
+    for name, flag_data, allowed in iter_config(target_config):
+        known = [value for value in flag_data.get("values", []) if value != "unknown"]
+        if set(known) <= set(allowed):
+            continue  # every value is acceptable at this level
+        default = flag_data.get("default_value")
+        targets.append((name, flag_data, default if default in allowed else allowed[0]))
+    return targets
+
+
+def atomic_write(path, content):
+    """Writes content to path via a temp file in the same directory and os.replace().
+
+    A symlinked path is written through to its target, so the link itself is kept.
+    """
+    path = os.path.realpath(path)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    mode = os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".protego-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _managed_lines(content):
+    """The settings in a managed file, without Protego's header or blank lines."""
+    return [line for line in (content or "").splitlines() if line.strip() and not line.startswith("# Managed by Protego")]
+
+
+class LinuxEngine:
+    def __init__(self, target_config, level="strict", root="/", dry_run=False):
+        self.target_config = target_config
+        self.level = level
+        self.root = root
+        self.fs = probes.RootFS(root)
+        self.dry_run = dry_run
+        self.results = []
+
+    def check_compliance(self):
+        """Checks current state against the level's allowed values."""
+        print("-> Executing Linux Compliance Check...")
+        self.results = evaluate(self.target_config, self.fs)
+        for result in self.results:
+            print(f"   {result['parameter']}: {result['status']} (current: {result['current']}, allowed: {', '.join(result['allowed'])})")
+        return self.results
+
+    def plan(self):
+        """Converts the level into the full desired content of each managed file.
+
+        Managed files are only ever tightened: settings written by a stricter level stay in place
+        when a more relaxed level is applied (use the backups to undo them), the same way fstab
+        options are only added.
+
+        Returns ({path: content}, {subsystem: details}) for files whose content must change.
+        """
+        header = f"# Managed by Protego (last applied level: {self.level}). Do not edit; changes are overwritten.\n"
+        modprobe_lines, sysctl_lines, audit_lines = [], [], []
+        disabled_modules, fstab_options = [], {}
+
+        for name, flag_data, target in enforced_targets(self.target_config):
+            check_type = flag_data.get("check_type")
+            if check_type == "MODPROBE" and target == "no":
+                modprobe_lines += [f"install {flag_data['module']} /bin/false", f"blacklist {flag_data['module']}"]
+                disabled_modules.append(flag_data["module"])
+            elif check_type == "SYSCTL":
+                sysctl_lines.append(f"{flag_data['key']} = {target}")
+            elif check_type == "AUDIT_RULE" and target == "yes":
+                audit_lines += flag_data["rules"]
+            elif check_type == "FSTAB_OPTION":
+                fstab_options.setdefault(flag_data["mount_point"], {})[flag_data["option"]] = (target == "yes")
+
+        managed = {
+            MODPROBE_FILE: ("modprobe", self._merge_managed(MODPROBE_FILE, modprobe_lines)),
+            SYSCTL_FILE: ("sysctl", self._merge_managed(SYSCTL_FILE, sysctl_lines, lambda line: line.split(" = ", 1)[0])),
+            AUDIT_RULES_FILE: ("audit", self._merge_managed(AUDIT_RULES_FILE, audit_lines)),
+        }
+
+        changes, subsystems = {}, {}
+        for path, (subsystem, lines) in managed.items():
+            if not lines or _managed_lines(self.fs.read(path)) == lines:
+                continue
+            changes[path] = header + "\n".join(lines) + "\n"
+            subsystems[subsystem] = disabled_modules if subsystem == "modprobe" else []
+
+        for path, content in self._plan_sysctl_overrides(managed[SYSCTL_FILE][1]).items():
+            changes[path] = content
+            subsystems.setdefault("sysctl", [])
+
+        fstab, remounts = self._plan_fstab(fstab_options)
+        if remounts:
+            changes[FSTAB_FILE] = fstab
+            subsystems["fstab"] = remounts
+
+        # Write through symlinks (e.g. Debian's 99-sysctl.conf -> ../sysctl.conf) to the real file
+        return {self.fs.resolve(path): content for path, content in changes.items()}, subsystems
+
+    def _merge_managed(self, path, lines, key=None):
+        """The lines already in a managed file plus the level's lines; with key, new lines replace old ones with the same key."""
+        merged = _managed_lines(self.fs.read(path))
+        for line in lines:
+            if key:
+                merged = [line if key(old) == key(line) else old for old in merged]
+            if line not in merged:
+                merged.append(line)
+        return merged
+
+    def _plan_sysctl_overrides(self, sysctl_lines):
+        """Comments out conflicting keys in files 'sysctl --system' applies after SYSCTL_FILE.
+
+        That is every /etc/sysctl.d drop-in sorting after it, and /etc/sysctl.conf, which is applied last.
+        """
+        if not sysctl_lines:
+            return {}
+        enforced = dict(line.split(" = ", 1) for line in sysctl_lines)
+        own_name = os.path.basename(SYSCTL_FILE)
+        later = ["/etc/sysctl.d/" + name for name in self.fs.listdir("/etc/sysctl.d")
+                 if name.endswith(".conf") and name > own_name]
+
+        changes, seen = {}, set()
+        for path in later + [SYSCTL_CONF_FILE]:
+            # The same file may be reachable under several names through symlinks; plan it once
+            real_path = self.fs.resolve(path)
+            if real_path in seen:
+                continue
+            seen.add(real_path)
+            original = self.fs.read(path)
+            if original is None:
+                continue
+            lines, changed = [], False
+            for line in original.splitlines():
+                stripped = line.strip()
+                if stripped and not stripped.startswith(("#", ";")) and "=" in stripped:
+                    key, value = (part.strip() for part in stripped.split("=", 1))
+                    key = key.replace("/", ".")
+                    if key in enforced and value != enforced[key]:
+                        line = f"# {line}  # overridden by Protego ({SYSCTL_FILE})"
+                        changed = True
+                lines.append(line)
+            if changed:
+                changes[real_path] = "\n".join(lines) + "\n"
+        return changes
+
+    def _plan_fstab(self, fstab_options):
+        """Rewrites the options column of the affected mount points, keeping every other line as-is."""
+        original = self.fs.read(FSTAB_FILE)
+        if original is None or not fstab_options:
+            return None, []
+
+        lines, remounts, seen = [], [], set()
+        for line in original.splitlines():
+            entry, hash_sign, comment = line.partition("#")
+            fields = entry.split()
+            if len(fields) >= 4 and fields[1] in fstab_options:
+                seen.add(fields[1])
+                options = fields[3].split(",")
+                for option, wanted in fstab_options[fields[1]].items():
+                    if wanted and option not in options:
+                        options.append(option)
+                    elif not wanted and option in options:
+                        options.remove(option)
+                if options != fields[3].split(","):
+                    fields[3] = ",".join(options)
+                    # Keep any trailing comment on the entry
+                    line = "\t".join(fields) + (f"\t{hash_sign}{comment}" if hash_sign else "")
+                    remounts.append(fields[1])
+            lines.append(line)
+
+        for mount_point in fstab_options:
+            if mount_point not in seen:
+                print(f"   [WARNING] {mount_point} is not a separate fstab entry; mount options not applied.")
+        return "\n".join(lines) + "\n", remounts
+
+    def harden_system(self, max_passes=2):
+        """Writes all changed files in one pass, then reloads each changed subsystem once.
+
+        If verification still finds non-compliant parameters, the level is planned again
+        (e.g. a file changed or appeared in between) for up to max_passes passes.
+        """
+        print(f"\n-> 1. Planning {self.level} hardening for root {self.root}...")
+        changes, subsystems = self.plan()
+        if not changes:
+            print("   Nothing to change; all managed files already match this level.")
+            results = self.check_compliance()
+            self._report_unfixed(results)
+            return results
+
+        for path in changes:
+            print(f"   - {path}")
+        if self.dry_run:
+            print("   Dry run: no files written.")
+            return []
+
+        for attempt in range(1, max_passes + 1):
+            self._apply(changes, subsystems)
+            print("\n-> 4. Verifying final compliance state...")
+            results = self.check_compliance()
+            if all(result["status"] == "COMPLIANT" for result in results):
+                return results
+
+            changes, subsystems = self.plan()
+            if not changes or attempt == max_passes:
+                break
+            print("\n-> Still non-compliant; re-planning:")
+            for path in changes:
+                print(f"   - {path}")
+
+        self._report_unfixed(results)
+        return results
+
+    def _apply(self, changes, subsystems):
+        print("\n-> 2. Backing up and writing files...")
+        backup_dir = os.path.join(self.fs.path(BACKUP_DIR), datetime.datetime.now().strftime("%Y%m%d_%H%M%S"))
+        for path, content in changes.items():
+            target = self.fs.path(path)
+            if os.path.exists(target):
+                backup_path = os.path.join(backup_dir, path.lstrip("/"))
+                os.makedirs(os.path.dirname(backup_path), exist_ok=True)
+                shutil.copy2(target, backup_path)
+            atomic_write(target, content)
+        print(f"   Wrote {len(changes)} file(s).")
+
+        print("\n-> 3. Activating changes...")
+        self._activate(subsystems)
+
+    def _report_unfixed(self, results):
+        unfixed = [result["parameter"] for result in results if result["status"] != "COMPLIANT"]
+        if unfixed:
+            print(f"   [WARNING] Still non-compliant after hardening: {', '.join(unfixed)}")
+
+    def _activate(self, subsystems):
+        """One reload per changed subsystem. Skipped when hardening an alternate root."""
+        commands = []
+        if "modprobe" in subsystems:
+            loaded = probes.loaded_modules(self.fs, {})
+            modules = [m for m in subsystems["modprobe"] if m in loaded]
+            if modules:
+                commands.append(["modprobe", "-r"] + modules)
+        if "sysctl" in subsystems:
+            commands.append(["sysctl", "-p", SYSCTL_FILE])
+        if "fstab" in subsystems:
+            commands += [["mount", "-o", "remount", mount_point] for mount_point in subsystems["fstab"]]
+        if "audit" in subsystems:
+            commands.append(["augenrules", "--load"])
+
+        for command in commands:
+            if os.path.abspath(self.root) != "/":
+                print(f"   (alternate root) skipped: {' '.join(command)}")
+                continue
+            try:
+                subprocess.run(command, check=True, capture_output=True, text=True)
+                print(f"   {' '.join(command)}: Success")
+            except (subprocess.CalledProcessError, FileNotFoundError) as e:
+                print(f"   [ERROR] {' '.join(command)} failed: {getattr(e, 'stderr', e)}")
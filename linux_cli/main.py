@@ -2,38 +2,92 @@
 # Change the above line, I think we can do which python3 on the target system and add the path above
 
 import argparse
+import fnmatch
+import json
 import subprocess
+import sys
 import flags
 import default_configs
+import probes
+import linux_engine
+import image_scan
 
-parser = argparse.ArgumentParser(
-    prog="Protego",
-    description="I protect you",
-    epilog="Thanks for using protego"
-)
+CONFIG_LEVELS = {
+    "easy": default_configs.easy_configs,
+    "medium": default_configs.medium_configs,
+    "strict": default_configs.strong_configs
+}
 
-subparsers = parser.add_subparsers(dest='command', help='Available commands', required=True)
 
-subparser_get = subparsers.add_parser("get", help="Get the current value of a parameter")
-subparser_get.add_argument("parameter")
+def get_parameters(patterns, root="/"):
+    """Live-reads every flag matching the names/glob patterns (case-insensitive, like the Windows CLI),
+    sharing file reads between them."""
+    entries, records, unmatched = [], [], []
+    for pattern in patterns:
+        matched = False
+        for category in flags.flags:
+            for name, flag_data in flags.flags[category].items():
+                if fnmatch.fnmatchcase(name.lower(), pattern.lower()):
+                    matched = True
+                    if name not in [entry[0] for entry in entries]:
+                        entries.append((name, flag_data))
+                        records.append({"parameter": name, "category": category})
+        if not matched:
+            unmatched.append(pattern)
 
+    values = probes.read_parameters(entries, probes.RootFS(root))
+    for record in records:
+        record["value"] = values[record["parameter"]]
+    return records, unmatched
 
 
+def main():
+    parser = argparse.ArgumentParser(
+        prog="Protego",
+        description="I protect you",
+        epilog="Thanks for using protego"
+    )
 
-args = parser.parse_args()
+    subparsers = parser.add_subparsers(dest='command', help='Available commands', required=True)
 
-def get_parameter(parameter):
-    for category in flags.flags:
-        if parameter in flags.flags[category]:
-            return flags.flags[category][parameter]["value"]
-    return "Invalid flag"
+    subparser_get = subparsers.add_parser("get", help="Get the live value of parameters (JSON output)")
+    subparser_get.add_argument("parameters", nargs='+', help="Parameter names or glob patterns (e.g. '*_available')")
+    subparser_get.add_argument("--root", default="/", help="Read files relative to this root instead of /")
 
-if args.command == "get":
-    print(args)
-match args.command:
-    case "get":
-        print(get_parameter(args.parameter))
-    case _:
-        print("Invalid command")
+    subparser_check = subparsers.add_parser("check", help="Check compliance against a hardening level")
+    subparser_check.add_argument("--level", default="strict", choices=["easy", "medium", "strict"])
+    subparser_check.add_argument("--root", default="/", help="Check files relative to this root instead of /")
 
+    subparser_harden = subparsers.add_parser("harden", help="Apply a hardening level")
+    subparser_harden.add_argument("--level", default="strict", choices=["easy", "medium", "strict"])
+    subparser_harden.add_argument("--root", default="/", help="Apply to files relative to this root (activation is skipped)")
+    subparser_harden.add_argument("--dry-run", action="store_true", help="Only print the files that would change")
 
+    subparser_scan = subparsers.add_parser("scan-images", help="Check container/VM image tarballs or extracted trees")
+    subparser_scan.add_argument("images", nargs='+', help="Image tarballs (docker save / rootfs tar) or directories")
+    subparser_scan.add_argument("--level", default="strict", choices=["easy", "medium", "strict"])
+    subparser_scan.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    subparser_scan.add_argument("--cache-dir", default=None, help="Persist parsed layers here to reuse across runs")
+
+    args = parser.parse_args()
+
+    match args.command:
+        case "get":
+            records, unmatched = get_parameters(args.parameters, args.root)
+            print(json.dumps(records, indent=2))
+            if unmatched:
+                print(f"Invalid flag(s): {', '.join(unmatched)}", file=sys.stderr)
+                sys.exit(1)
+        case "check":
+            linux_engine.LinuxEngine(CONFIG_LEVELS[args.level], args.level, args.root).check_compliance()
+        case "harden":
+            linux_engine.LinuxEngine(CONFIG_LEVELS[args.level], args.level, args.root, args.dry_run).harden_system()
+        case "scan-images":
+            results = image_scan.scan_images(args.images, CONFIG_LEVELS[args.level], args.workers, args.cache_dir)
+            print(json.dumps(results, indent=2))
+        case _:
+            print("Invalid command")
+
+
+if __name__ == "__main__":
+    main()
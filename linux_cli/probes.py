@@ -0,0 +1,165 @@
+import os
+import re
+
+
+class RootFS:
+    """Reads files relative to a root directory ("/" for the live system)."""
+
+    def __init__(self, root="/"):
+        self.root = root
+
+    def path(self, path):
+        return os.path.join(self.root, path.lstrip("/"))
+
+    def resolve(self, path, max_links=40):
+        """Follows symlinks the way the system under root would see them (absolute targets stay
+        inside root). Returns the root-relative path of the real file, e.g. '/etc/sysctl.conf'
+        for Debian's '/etc/sysctl.d/99-sysctl.conf -> ../sysctl.conf'."""
+        parts, resolved = [p for p in path.split("/") if p], []
+        while parts:
+            part = parts.pop(0)
+            if part == ".":
+                continue
+            if part == "..":
+                if resolved:
+                    resolved.pop()
+                continue
+            full = self.path("/" + "/".join(resolved + [part]))
+            if os.path.islink(full):
+                max_links -= 1
+                if max_links < 0:
+                    raise OSError(f"Too many levels of symbolic links: {path}")
+                target = os.readlink(full)
+                if target.startswith("/"):
+                    resolved = []
+                parts = [p for p in target.split("/") if p] + parts
+            else:
+                resolved.append(part)
+        return "/" + "/".join(resolved)
+
+    def read(self, path):
+        try:
+            with open(self.path(path), "r", errors="replace") as f:
+                return f.read()
+        except (FileNotFoundError, IsADirectoryError, PermissionError):
+            return None
+
+    def listdir(self, path):
+        try:
+            return sorted(os.listdir(self.path(path)))
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            return []
+
+
+def modprobe_directives(fs, cache):
+    """Parses every /etc/modprobe.d/*.conf once: {module: {"install": cmd, "blacklist": bool}}."""
+    if "modprobe" not in cache:
+        directives = {}
+        for name in fs.listdir("/etc/modprobe.d"):
+            if not name.endswith(".conf"):
+                continue
+            for line in (fs.read("/etc/modprobe.d/" + name) or "").splitlines():
+                parts = line.split("#", 1)[0].split()
+                if len(parts) >= 2 and parts[0] == "install":
+                    directives.setdefault(parts[1], {})["install"] = " ".join(parts[2:])
+                elif len(parts) >= 2 and parts[0] == "blacklist":
+                    directives.setdefault(parts[1], {})["blacklist"] = True
+        cache["modprobe"] = directives
+    return cache["modprobe"]
+
+
+def loaded_modules(fs, cache):
+    if "modules" not in cache:
+        cache["modules"] = {line.split()[0] for line in (fs.read("/proc/modules") or "").splitlines() if line.strip()}
+    return cache["modules"]
+
+
+def probe_modprobe(flag_data, fs, cache):
+    """'no' when the module is loaded nowhere and modprobe is told to run /bin/true or /bin/false instead."""
+    module = flag_data["module"]
+    directive = modprobe_directives(fs, cache).get(module, {})
+    disabled = bool(re.match(r"^/(usr/)?bin/(true|false)$", directive.get("install", "")))
+    if disabled and module not in loaded_modules(fs, cache):
+        return "no"
+    return "yes"
+
+
+def sysctl_settings(fs, cache):
+    """Configured sysctl values, in the order 'sysctl --system' applies them (later files win)."""
+    if "sysctl" not in cache:
+        settings = {}
+        paths = ["/etc/sysctl.d/" + name for name in fs.listdir("/etc/sysctl.d") if name.endswith(".conf")]
+        for path in paths + ["/etc/sysctl.conf"]:
+            for line in (fs.read(path) or "").splitlines():
+                line = line.strip()
+                if line and not line.startswith(("#", ";")) and "=" in line:
+                    key, value = line.split("=", 1)
+                    settings[key.strip().replace("/", ".")] = value.strip()
+        cache["sysctl"] = settings
+    return cache["sysctl"]
+
+
+def probe_sysctl(flag_data, fs, cache):
+    """Running value from /proc/sys when available, otherwise the configured value."""
+    key = flag_data["key"]
+    running = fs.read("/proc/sys/" + key.replace(".", "/"))
+    if running is not None:
+        return running.strip()
+    return sysctl_settings(fs, cache).get(key, "unknown")
+
+
+def fstab_entries(fs, cache):
+    """Parses /etc/fstab once: {mount_point: [options]}."""
+    if "fstab" not in cache:
+        entries = {}
+        for line in (fs.read("/etc/fstab") or "").splitlines():
+            fields = line.split("#", 1)[0].split()
+            if len(fields) >= 4:
+                entries[fields[1]] = fields[3].split(",")
+        cache["fstab"] = entries
+    return cache["fstab"]
+
+
+def probe_fstab_option(flag_data, fs, cache):
+    options = fstab_entries(fs, cache).get(flag_data["mount_point"])
+    if options is None:
+        return "no"
+    return "yes" if flag_data["option"] in options else "no"
+
+
+def audit_rules(fs, cache):
+    """Every audit rule line from /etc/audit/rules.d/*.rules and /etc/audit/audit.rules."""
+    if "audit" not in cache:
+        rules = set()
+        paths = ["/etc/audit/rules.d/" + name for name in fs.listdir("/etc/audit/rules.d") if name.endswith(".rules")]
+        for path in paths + ["/etc/audit/audit.rules"]:
+            for line in (fs.read(path) or "").splitlines():
+                line = " ".join(line.split())
+                if line and not line.startswith("#"):
+                    rules.add(line)
+        cache["audit"] = rules
+    return cache["audit"]
+
+
+def probe_audit_rule(flag_data, fs, cache):
+    rules = audit_rules(fs, cache)
+    return "yes" if all(" ".join(rule.split()) in rules for rule in flag_data["rules"]) else "no"
+
+
+PROBES = {
+    "MODPROBE": probe_modprobe,
+    "SYSCTL": probe_sysctl,
+    "FSTAB_OPTION": probe_fstab_option,
+    "AUDIT_RULE": probe_audit_rule,
+}
+
+
+def read_parameters(entries, fs=None):
+    """Reads the live value of each (name, flag_data) pair. Files shared by several probes are parsed once."""
+    fs = fs or RootFS()
+    cache = {}
+    values = {}
+    for name, flag_data in entries:
+        probe = PROBES.get(flag_data.get("check_type"))
+        values[name] = probe(flag_data, fs, cache) if probe else flag_data.get("value", "unknown")
+    return values
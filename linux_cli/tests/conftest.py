@@ -0,0 +1,5 @@
+import os
+import sys
+
+# linux_cli modules import each other as top-level modules (flags, probes, ...)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,117 @@
+import io
+import json
+import tarfile
+
+import pytest
+
+import default_configs
+import image_scan
+
+
+def layer_tar(entries):
+    """Builds a layer tarball from {path: content}; None content makes an empty whiteout marker."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for path, content in entries.items():
+            data = (content or "").encode()
+            info = tarfile.TarInfo(path)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def docker_save(path, layers):
+    """Writes a docker-save style image tarball with the given {layer_id: entries}, bottom first."""
+    with tarfile.open(path, "w") as image:
+        manifest = [{"Config": "config.json", "Layers": [f"{layer_id}/layer.tar" for layer_id in layers]}]
+        members = {"manifest.json": json.dumps(manifest).encode()}
+        members.update({f"{layer_id}/layer.tar": layer_tar(entries) for layer_id, entries in layers.items()})
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            image.addfile(info, io.BytesIO(data))
+    return str(path)
+
+
+BASE = {
+    "etc/sysctl.d/10-forward.conf": "net.ipv4.ip_forward = 1\n",
+    "etc/modprobe.d/cramfs.conf": "install cramfs /bin/false\n",
+    "usr/bin/tool": "irrelevant\n",
+}
+
+
+@pytest.fixture
+def images(tmp_path):
+    removes_file = docker_save(tmp_path / "a.tar", {
+        "base": BASE,
+        "top-a": {"etc/sysctl.d/.wh.10-forward.conf": None},
+    })
+    opaque_dir = docker_save(tmp_path / "b.tar", {
+        "base": BASE,
+        "top-b": {"etc/modprobe.d/.wh..wh..opq": None, "etc/modprobe.d/other.conf": "blacklist usb\n"},
+    })
+    return removes_file, opaque_dir
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    calls = []
+    read_layer = image_scan.read_layer
+    monkeypatch.setattr(image_scan, "read_layer", lambda source: calls.append(source) or read_layer(source))
+    return calls
+
+
+def statuses(results, image):
+    return {r["parameter"]: (r["status"], r["current"]) for r in results[image]}
+
+
+def test_shared_layers_are_parsed_once(images, reads):
+    image_scan.scan_images(list(images), default_configs.strong_configs, workers=1)
+    assert sorted(member for _, _, member in reads) == ["base/layer.tar", "top-a/layer.tar", "top-b/layer.tar"]
+
+
+def test_irrelevant_files_are_not_kept(images):
+    _, layer = image_scan.load_layer(("base", ("member", images[0], "base/layer.tar"), None))
+    assert set(layer["files"]) == {"etc/sysctl.d/10-forward.conf", "etc/modprobe.d/cramfs.conf"}
+
+
+def test_whiteouts_and_opaque_directories(images):
+    results = image_scan.scan_images(list(images), default_configs.strong_configs, workers=1)
+    removes_file, opaque_dir = (statuses(results, image) for image in images)
+
+    # .wh.10-forward.conf removes the base layer's ip_forward = 1
+    assert removes_file["ip_forward"] == ("NON-COMPLIANT", "unknown")
+    assert removes_file["cramfs_available"] == ("COMPLIANT", "no")
+    # .wh..wh..opq hides the base layer's modprobe.d, but not its sysctl.d
+    assert opaque_dir["cramfs_available"] == ("NON-COMPLIANT", "yes")
+    assert opaque_dir["ip_forward"] == ("NON-COMPLIANT", "1")
+
+
+def test_merge_layers_applies_layers_bottom_to_top():
+    files = image_scan.merge_layers([
+        {"files": {"etc/fstab": "old", "etc/audit/a.rules": "x"}, "whiteouts": [], "opaque": []},
+        {"files": {}, "whiteouts": ["etc/audit"], "opaque": []},
+        {"files": {"etc/fstab": "new"}, "whiteouts": [], "opaque": []},
+    ])
+    assert files == {"etc/fstab": "new"}
+
+
+def test_cache_is_hit_on_the_second_run(images, reads, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    first = image_scan.scan_images(list(images), default_configs.strong_configs, workers=1, cache_dir=cache_dir)
+    assert len(reads) == 3
+
+    reads.clear()
+    second = image_scan.scan_images(list(images), default_configs.strong_configs, workers=1, cache_dir=cache_dir)
+    assert reads == []
+    assert second == first
+
+
+def test_cache_is_invalidated_when_relevant_paths_change(images, reads, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    image_scan.scan_images(list(images), default_configs.strong_configs, workers=1, cache_dir=cache_dir)
+    reads.clear()
+
+    monkeypatch.setattr(image_scan, "RELEVANT_PATHS", image_scan.RELEVANT_PATHS + ("etc/security/",))
+    image_scan.scan_images(list(images), default_configs.strong_configs, workers=1, cache_dir=cache_dir)
+    assert len(reads) == 3
@@ -0,0 +1,123 @@
+import os
+import stat
+
+import default_configs
+import linux_engine
+from linux_engine import LinuxEngine, atomic_write, MODPROBE_FILE, SYSCTL_FILE, AUDIT_RULES_FILE, FSTAB_FILE
+
+
+def write(root, path, content):
+    full = os.path.join(root, path.lstrip("/"))
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, "w") as f:
+        f.write(content)
+
+
+def read(root, path):
+    with open(os.path.join(root, path.lstrip("/"))) as f:
+        return f.read()
+
+
+def engine(root, level="strict"):
+    configs = {"easy": default_configs.easy_configs, "strict": default_configs.strong_configs}
+    return LinuxEngine(configs[level], level, str(root))
+
+
+def test_plan_writes_every_managed_file(tmp_path):
+    write(tmp_path, FSTAB_FILE, "tmpfs /tmp tmpfs defaults 0 0\n")
+    changes, subsystems = engine(tmp_path).plan()
+
+    assert set(changes) == {MODPROBE_FILE, SYSCTL_FILE, AUDIT_RULES_FILE, FSTAB_FILE}
+    assert "install cramfs /bin/false" in changes[MODPROBE_FILE]
+    assert "net.ipv4.ip_forward = 0" in changes[SYSCTL_FILE]
+    assert "tmpfs\t/tmp\ttmpfs\tdefaults,nodev,nosuid\t0\t0" in changes[FSTAB_FILE]
+    assert subsystems["modprobe"] == ["cramfs", "freevxfs"]
+    assert subsystems["fstab"] == ["/tmp"]
+
+
+def test_fstab_keeps_inline_comments(tmp_path):
+    write(tmp_path, FSTAB_FILE, "# static table\ntmpfs /tmp tmpfs defaults 0 0 # scratch space\n")
+    changes, _ = engine(tmp_path).plan()
+
+    assert changes[FSTAB_FILE] == "# static table\ntmpfs\t/tmp\ttmpfs\tdefaults,nodev,nosuid\t0\t0\t# scratch space\n"
+
+
+def test_atomic_write_keeps_mode_and_leaves_no_temp_files(tmp_path):
+    path = tmp_path / "etc" / "sysctl.conf"
+    write(tmp_path, "/etc/sysctl.conf", "old\n")
+    os.chmod(path, 0o600)
+
+    atomic_write(str(path), "new\n")
+
+    assert path.read_text() == "new\n"
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert os.listdir(path.parent) == ["sysctl.conf"]
+
+
+def test_harden_is_idempotent(tmp_path):
+    write(tmp_path, FSTAB_FILE, "tmpfs /tmp tmpfs defaults 0 0\n")
+    results = engine(tmp_path).harden_system()
+    assert all(result["status"] == "COMPLIANT" for result in results)
+
+    before = {path: read(tmp_path, path) for path in (MODPROBE_FILE, SYSCTL_FILE, AUDIT_RULES_FILE, FSTAB_FILE)}
+    assert engine(tmp_path).plan() == ({}, {})
+    engine(tmp_path).harden_system()
+    assert {path: read(tmp_path, path) for path in before} == before
+
+
+def test_later_sysctl_drop_ins_are_overridden(tmp_path):
+    write(tmp_path, "/etc/sysctl.d/99-custom.conf", "net.ipv4.ip_forward = 1\nvm.swappiness = 10\n")
+    write(tmp_path, "/etc/sysctl.d/10-early.conf", "net.ipv4.ip_forward = 1\n")
+    write(tmp_path, "/etc/sysctl.conf", "net.ipv4.ip_forward=1\n")
+
+    results = engine(tmp_path).harden_system()
+
+    assert {r["parameter"]: r["status"] for r in results}["ip_forward"] == "COMPLIANT"
+    assert read(tmp_path, "/etc/sysctl.d/99-custom.conf").startswith("# net.ipv4.ip_forward = 1")
+    assert "vm.swappiness = 10" in read(tmp_path, "/etc/sysctl.d/99-custom.conf")
+    # Drop-ins applied before Protego's file cannot override it and are left alone
+    assert read(tmp_path, "/etc/sysctl.d/10-early.conf") == "net.ipv4.ip_forward = 1\n"
+    assert read(tmp_path, "/etc/sysctl.conf").startswith("# net.ipv4.ip_forward=1")
+
+
+def test_relaxed_level_never_relaxes_managed_files(tmp_path):
+    write(tmp_path, FSTAB_FILE, "tmpfs /tmp tmpfs defaults 0 0\n")
+    engine(tmp_path, "strict").harden_system()
+    strict = {path: read(tmp_path, path) for path in (MODPROBE_FILE, SYSCTL_FILE, AUDIT_RULES_FILE, FSTAB_FILE)}
+
+    assert engine(tmp_path, "easy").plan() == ({}, {})
+    engine(tmp_path, "easy").harden_system()
+    assert {path: read(tmp_path, path) for path in strict} == strict
+
+
+def test_dry_run_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(linux_engine, "atomic_write", lambda *args: (_ for _ in ()).throw(AssertionError()))
+    LinuxEngine(default_configs.strong_configs, "strict", str(tmp_path), dry_run=True).harden_system()
+    assert not (tmp_path / "etc").exists()
+
+
+def test_symlinked_sysctl_files_are_written_through(tmp_path):
+    # Debian/Ubuntu layout: /etc/sysctl.d/99-sysctl.conf -> ../sysctl.conf
+    write(tmp_path, "/etc/sysctl.conf", "net.ipv4.ip_forward = 1\n")
+    link = tmp_path / "etc" / "sysctl.d" / "99-sysctl.conf"
+    link.parent.mkdir(parents=True, exist_ok=True)
+    os.symlink("../sysctl.conf", link)
+
+    changes, _ = engine(tmp_path).plan()
+    assert "/etc/sysctl.conf" in changes
+    assert "/etc/sysctl.d/99-sysctl.conf" not in changes
+
+    results = engine(tmp_path).harden_system()
+    assert {r["parameter"]: r["status"] for r in results}["ip_forward"] == "COMPLIANT"
+    assert os.readlink(link) == "../sysctl.conf"
+    assert read(tmp_path, "/etc/sysctl.conf").startswith("# net.ipv4.ip_forward = 1")
+
+
+def test_atomic_write_keeps_symlinks(tmp_path):
+    (tmp_path / "real.conf").write_text("old\n")
+    os.symlink("real.conf", tmp_path / "link.conf")
+
+    atomic_write(str(tmp_path / "link.conf"), "new\n")
+
+    assert os.path.islink(tmp_path / "link.conf")
+    assert (tmp_path / "real.conf").read_text() == "new\n"
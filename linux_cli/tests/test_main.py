@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+from main import get_parameters
+
+
+@pytest.mark.parametrize("pattern", ["ip_forward", "IP_FORWARD", "Ip_Forw*"])
+def test_get_parameters_matches_case_insensitively(tmp_path, pattern):
+    os.makedirs(tmp_path / "etc")
+    (tmp_path / "etc" / "sysctl.conf").write_text("net.ipv4.ip_forward = 0\n")
+
+    records, unmatched = get_parameters([pattern], str(tmp_path))
+    assert unmatched == []
+    assert [(r["parameter"], r["value"]) for r in records] == [("ip_forward", "0")]
+
+
+def test_get_parameters_reports_unmatched_patterns(tmp_path):
+    records, unmatched = get_parameters(["no_such_*"], str(tmp_path))
+    assert (records, unmatched) == ([], ["no_such_*"])
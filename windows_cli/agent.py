@@ -0,0 +1,141 @@
+# PROTEGO_WINDOWS/agent.py
+
+import io
+import os
+import sys
+import contextlib
+from multiprocessing.connection import Listener
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
+
+from win_configs import BASELINES, resolve_baseline
+from windows_engine import WindowsEngine
+from utils.agent_ipc import AGENT_ADDRESS, AGENT_FAMILY, create_authkey, send_message, recv_message
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class ProtegoAgent:
+    """Resident process that keeps the catalog and engines warm and serves requests over local IPC."""
+
+    def __init__(self, address=AGENT_ADDRESS, family=AGENT_FAMILY):
+        self.address = address
+        self.family = family
+        self.config_levels = {name: resolve_baseline(name) for name in BASELINES}
+        self.engines = {}
+        self.running = False
+        self.methods = {
+            "ping": self._ping,
+            "get": self._get,
+            "check": self._check,
+            "harden": self._harden,
+            "rollback": self._rollback,
+            "shutdown": self._shutdown,
+        }
+
+    def _engine(self, level):
+        if level not in self.config_levels:
+            raise ValueError(f"Unknown level '{level}'.")
+        if level not in self.engines:
+            self.engines[level] = WindowsEngine(self.config_levels[level], level)
+        return self.engines[level]
+
+    # --- Methods ---
+    def _ping(self):
+        return "pong"
+
+    def _get(self, parameters):
+        records, unmatched = self._engine("strict").get_policies(parameters)
+        if unmatched:
+            raise ValueError(f"Parameter(s) not found: {', '.join(unmatched)}")
+        return records
+
+    def _check(self, level="strict"):
+        return [result.to_dict() for result in self._engine(level).check_compliance()]
+
+    def _harden(self, level="strict", full=False, resume=False):
+        """Returns the verification results of this run; empty when nothing was applied."""
+        engine = self._engine(level)
+        engine.harden_system(full, resume)
+        return [result.to_dict() for result in engine.results]
+
+    def _rollback(self):
+        self._engine("strict").rollback()
+        return True
+
+    def _shutdown(self):
+        self.running = False
+        return True
+
+    # --- Dispatch ---
+    def handle(self, request):
+        """Runs one JSON-RPC request. Engine console output is captured and returned alongside the result."""
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            # Batches (JSON arrays) are not supported; requests are handled one at a time
+            return {"jsonrpc": "2.0", "id": None,
+                    "error": {"code": INVALID_REQUEST, "message": "Expected a single JSON-RPC request object with a 'method'."}}
+
+        request_id = request.get("id")
+        method = self.methods.get(request.get("method"))
+        if method is None:
+            return {"jsonrpc": "2.0", "id": request_id,
+                    "error": {"code": METHOD_NOT_FOUND, "message": f"Unknown method '{request.get('method')}'."}}
+
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output):
+                result = method(**request.get("params", {}))
+        except (TypeError, ValueError) as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": INVALID_PARAMS, "message": str(e)}}
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": INTERNAL_ERROR, "message": str(e)}}
+
+        return {"jsonrpc": "2.0", "id": request_id, "result": {"value": result, "output": output.getvalue()}}
+
+    def serve(self):
+        """Accepts connections until a 'shutdown' request. Requests are handled one at a time."""
+        if self.family == "AF_UNIX" and os.path.exists(self.address):
+            os.remove(self.address)
+
+        try:
+            authkey = create_authkey()
+        except PermissionError as e:
+            print(f"Error: {e}. The agent was not started.")
+            return
+        self.running = True
+        with Listener(self.address, family=self.family, authkey=authkey) as listener:
+            if self.family == "AF_UNIX":
+                os.chmod(self.address, 0o600)
+            print(f"Protego agent listening on {self.address}")
+
+            while self.running:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    print(f"[WARNING] Rejected agent connection: {e}")
+                    continue
+
+                with conn:
+                    while self.running:
+                        try:
+                            request = recv_message(conn)
+                        except (EOFError, OSError):
+                            break
+                        except ValueError as e:
+                            # Not UTF-8 JSON; answer with a parse error and keep serving
+                            response = {"jsonrpc": "2.0", "id": None,
+                                        "error": {"code": PARSE_ERROR, "message": f"Parse error: {e}"}}
+                        else:
+                            response = self.handle(request)
+
+                        try:
+                            send_message(conn, response)
+                        except OSError:
+                            break
+
+        print("Protego agent stopped.")
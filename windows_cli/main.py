@@ -4,6 +4,7 @@
 import argparse
 import sys
 import os
+import json
 
 # Adjust path for internal imports
 sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
@@ -11,42 +12,23 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 # Project Imports
 try:
     from win_flags import win_flags
-    from win_configs import strong_configs, medium_configs, easy_configs
+    from win_configs import BASELINES, resolve_baseline
     from windows_engine import WindowsEngine 
+    from agent import ProtegoAgent
+    from utils.offline_audit import audit_offline, write_audit_json, snapshot_host
+    from utils.results import Status
+    from utils.analytics import load_frame, export_rollup, ROLLUP_COLUMNS
+    from utils.report_store import import_json_results, render_dashboard
 except ImportError as e:
     print(f"Critical Import Error: {e}. Check file names and structure.")
     sys.exit(1)
 
 
-CONFIG_LEVELS = { 
-    "easy": easy_configs, 
-    "medium": medium_configs, 
-    "strict": strong_configs 
-}
-
-def get_parameter_flag_data(parameter):
-    """Retrieves the full flag data from win_flags."""
-    for category in win_flags:
-        if parameter in win_flags[category]:
-            return win_flags[category][parameter]
-    return None
-
-def get_current_value(parameter):
-    """Placeholder for fetching current live value, primarily for 'get' command."""
-    # Note: For a true 'get' command in Windows, we would need to run the specific
-    # get_command defined in win_flags here, similar to how check_compliance does.
-    flag_data = get_parameter_flag_data(parameter)
-    if flag_data:
-        return flag_data.get('value', 'Value retrieval logic not fully implemented for this command.')
-    return "Invalid flag"
+# Every baseline (easy/medium/strict plus custom ones like cis_l1) flattened through its 'extends' chain
+CONFIG_LEVELS = {name: resolve_baseline(name) for name in BASELINES}
 
 
 def main():
-    if sys.platform != "win32":
-        # Check platform, though the Linux version handles Linux specifically.
-        print("Error: This is the Windows Engine. Run the correct Protego version.")
-        sys.exit(1)
-        
     parser = argparse.ArgumentParser(
         prog="Protego",
         description="Protego: Windows System Hardening Tool (Annexure A Compliance)",
@@ -56,57 +38,139 @@ def main():
     subparsers = parser.add_subparsers(dest='command', help='Available commands', required=True)
 
     # 1. GET Command
-    subparser_get = subparsers.add_parser("get", help="Get the target definition/current value of a policy flag")
-    subparser_get.add_argument("parameter", help="Policy name (e.g., MinimumPasswordLength)")
+    subparser_get = subparsers.add_parser("get", help="Get the live current value and target of policy flags (JSON output)")
+    subparser_get.add_argument("parameters", nargs='+', help="Policy names or glob patterns (e.g., MinimumPasswordLength 'Lockout*')")
 
     # 2. CHECK Command
-    subparsers.add_parser("check", help="Checks system compliance against the target policies.")
+    subparser_check = subparsers.add_parser("check", help="Checks system compliance against the target policies.")
+    subparser_check.add_argument("--level", default="strict", choices=list(CONFIG_LEVELS),
+                                 help="Baseline to check against.")
+    subparser_check.add_argument("--no-txt", action="store_true",
+                                 help="Only record results in the report store; skip the timestamped TXT report.")
 
     # 3. HARDEN Command
     subparser_harden = subparsers.add_parser("harden", help="Applies hardening policies to the system.")
-    subparser_harden.add_argument("--level", default="strict", choices=["easy", "medium", "strict"], 
+    subparser_harden.add_argument("--level", default="strict", choices=list(CONFIG_LEVELS), 
                                    help="Hardening level to apply.")
+    subparser_harden.add_argument("--full", action="store_true",
+                                   help="Re-apply every policy instead of only the delta from the last applied level.")
+    subparser_harden.add_argument("--resume", action="store_true",
+                                   help="Continue an interrupted harden run from its last completed step.")
+    subparser_harden.add_argument("--no-txt", action="store_true",
+                                   help="Only record results in the report store; skip the timestamped TXT reports.")
+    subparser_harden.add_argument("--reuse-sdb", action="store_true",
+                                   help="Reuse a cached compiled security database for this level.")
 
     # 4. ROLLBACK Command
     subparsers.add_parser("rollback", help="Reverts system to the last known backup state.")
 
+    # 5. AGENT Command (resident server; use protego_client.py to talk to it)
+    subparsers.add_parser("agent", help="Runs a resident agent serving get/check/harden/rollback over local IPC.")
+
+    # 6. AUDIT-OFFLINE Command (runs on any platform, never touches the live system)
+    subparser_audit = subparsers.add_parser("audit-offline", help="Audits exported .inf/.reg backups instead of the live system.")
+    subparser_audit.add_argument("paths", nargs='+', help="Exported .inf/.reg files or directories containing them")
+    subparser_audit.add_argument("--level", default="all", choices=list(CONFIG_LEVELS) + ["all"],
+                                 help="Policies to evaluate ('all' uses the full win_flags catalog).")
+    subparser_audit.add_argument("--workers", type=int, default=None, help="Number of worker processes.")
+    subparser_audit.add_argument("--json", dest="json_output", default=None, help="Write per-host results to this JSON file.")
+
+    # 7. ANALYTICS Command (fleet rollups over collected reports/JSON results)
+    subparser_analytics = subparsers.add_parser("analytics", help="Aggregates collected compliance results across hosts.")
+    subparser_analytics.add_argument("paths", nargs='+', help="Report .txt / results .json files or directories containing them")
+    subparser_analytics.add_argument("--by", default="policy", choices=list(ROLLUP_COLUMNS), help="Column to group compliance rates by.")
+    subparser_analytics.add_argument("--groups", default=None, help="JSON file mapping host name -> host group.")
+    subparser_analytics.add_argument("--export", default=None, help="Write the summary to a .csv or .parquet file.")
+
+    # 8. REPORT Command (fleet dashboard from the indexed report store)
+    subparser_report = subparsers.add_parser("report", help="Renders an HTML/Markdown dashboard from the report store.")
+    subparser_report.add_argument("--format", default="html", choices=["html", "markdown"], help="Dashboard format.")
+    subparser_report.add_argument("--output", default=None, help="Output file (default: Protego_Dashboard.html/.md).")
+    subparser_report.add_argument("--import", dest="imports", nargs='*', default=[],
+                                  help="JSON results files (e.g. from audit-offline --json) to add to the store first.")
+
 
     args = parser.parse_args()
 
-    print(f"Protego Windows Engine Initialized.")
+    if sys.platform != "win32" and args.command not in ["audit-offline", "analytics", "report"]:
+        # Check platform, though the Linux version handles Linux specifically.
+        print("Error: This is the Windows Engine. Run the correct Protego version.")
+        sys.exit(1)
+
+    if args.command != "get":
+        # get prints pure JSON so it can be consumed by other tools
+        print(f"Protego Windows Engine Initialized.")
     
     # Initialization for commands that need the Engine
-    if args.command in ["harden", "check", "rollback"]:
+    if args.command in ["get", "harden", "check", "rollback"]:
         level = getattr(args, 'level', 'strict')
         target_config = CONFIG_LEVELS[level]
-        engine = WindowsEngine(target_config, level) 
+        engine = WindowsEngine(target_config, level, getattr(args, 'reuse_sdb', False), not getattr(args, 'no_txt', False)) 
     
     # Execution Dispatch
     match args.command:
         case "get":
-            # Display both current value and target value
-            current_val = get_current_value(args.parameter)
-            flag_data = get_parameter_flag_data(args.parameter)
-            
-            print(f"\nPolicy: {args.parameter}")
-            print(f"  Current/Placeholder Value: {current_val}")
-            if flag_data:
-                print(f"  Target Value: {flag_data.get('target_value', 'N/A')}")
-                print(f"  Check Type: {flag_data.get('check_type', 'N/A')}")
-            else:
-                print(f"Error: Parameter '{args.parameter}' not found.")
+            # Only the requested policies are probed, sharing one secedit export between them
+            records, unmatched = engine.get_policies(args.parameters)
+            print(json.dumps(records, indent=2))
+            if unmatched:
+                print(f"Error: Parameter(s) not found: {', '.join(unmatched)}", file=sys.stderr)
+                sys.exit(1)
         
         case "check":
             engine.check_compliance() 
 
         case "harden":
-            engine.harden_system()
+            engine.harden_system(args.full, args.resume)
 
         case "rollback":
             engine.rollback()
+
+        case "agent":
+            ProtegoAgent().serve()
+
+        case "audit-offline":
+            if args.level == "all":
+                target_config = {category: list(policies) for category, policies in win_flags.items()}
+            else:
+                target_config = CONFIG_LEVELS[args.level]
+
+            audit_results = audit_offline(args.paths, target_config, args.workers)
+            if not audit_results:
+                print(f"[WARNING] No .inf/.reg backup files found under: {', '.join(args.paths)}")
+            for snapshot, results in audit_results:
+                compliant = sum(1 for r in results if r.status == Status.COMPLIANT)
+                assessed = sum(1 for r in results if r.status != Status.NOT_ASSESSED)
+                print(f"  {snapshot_host(snapshot)}/{os.path.basename(snapshot)}: {compliant}/{assessed} compliant ({len(results) - assessed} not assessable offline)")
+            print(f"\nAudited {len(audit_results)} snapshot(s).")
+
+            if args.json_output:
+                write_audit_json(audit_results, args.json_output)
+
+        case "analytics":
+            host_groups = None
+            if args.groups:
+                with open(args.groups, 'r') as f:
+                    host_groups = json.load(f)
+
+            frame = load_frame(args.paths, host_groups)
+            rows = frame.rollup(args.by)
+            print(f"\nCompliance by {args.by} ({len(frame)} results):")
+            for row in rows:
+                print(f"  {row[args.by]}: {row['compliance_rate'] * 100:.1f}% ({row['compliant']}/{row['assessed']})")
+
+            if args.export:
+                export_rollup(rows, args.export)
+
+        case "report":
+            for path in args.imports:
+                imported, skipped = import_json_results(path)
+                print(f"Imported {imported} run(s) from {path} ({skipped} already in the store)")
+            output = args.output or ("Protego_Dashboard.html" if args.format == "html" else "Protego_Dashboard.md")
+            render_dashboard(output, args.format)
             
         case _:
             print("Invalid command.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
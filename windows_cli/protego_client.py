@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# Thin client for a running 'main.py agent'. Only imports the stdlib IPC helpers so it starts quickly.
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
+
+from utils.agent_ipc import call, AgentError
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="protego-client",
+        description="Sends commands to a running Protego agent.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the raw result as JSON.")
+    subparsers = parser.add_subparsers(dest='command', help='Available commands', required=True)
+
+    subparser_get = subparsers.add_parser("get", help="Get live values of policy flags")
+    subparser_get.add_argument("parameters", nargs='+', help="Policy names or glob patterns")
+
+    subparser_check = subparsers.add_parser("check", help="Checks system compliance")
+    subparser_check.add_argument("--level", default="strict")
+
+    subparser_harden = subparsers.add_parser("harden", help="Applies hardening policies")
+    subparser_harden.add_argument("--level", default="strict")
+    subparser_harden.add_argument("--full", action="store_true")
+    subparser_harden.add_argument("--resume", action="store_true")
+
+    subparsers.add_parser("rollback", help="Reverts to the last backup")
+    subparsers.add_parser("ping", help="Checks that the agent is running")
+    subparsers.add_parser("shutdown", help="Stops the agent")
+
+    args = parser.parse_args()
+    params = {key: value for key, value in vars(args).items() if key not in ("command", "json")}
+
+    try:
+        result = call(args.command, params)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print("Error: Protego agent is not running. Start it with 'main.py agent'.")
+        sys.exit(1)
+    except AgentError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(result["value"], indent=2))
+    else:
+        if result["output"]:
+            print(result["output"], end="")
+        if args.command == "get" or isinstance(result["value"], dict):
+            print(json.dumps(result["value"], indent=2))
+        elif isinstance(result["value"], str):
+            print(result["value"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Same import roots main.py sets up: windows_cli/ (win_flags, utils.*) and windows_cli/utils/
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "utils"))
@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from utils.analytics import load_frame
+
+
+def test_unrelated_json_and_bad_timestamps_are_skipped(tmp_path):
+    records = [
+        {"host": "a", "policy": "P", "status": "COMPLIANT", "timestamp": "2025-10-04 00:28:21"},
+        {"host": "b", "policy": "P", "status": "NON-COMPLIANT", "timestamp": "yesterday"},
+        {"host": "c", "policy": "P", "status": "COMPLIANT", "timestamp": 12345},
+        "not a record",
+    ]
+    (tmp_path / "results.json").write_text(json.dumps(records))
+    (tmp_path / "groups.json").write_text(json.dumps({"a": "web"}))
+    (tmp_path / "backups").mkdir()
+    (tmp_path / "backups" / "protego_state.json").write_text(json.dumps({"last_applied": {}}))
+    (tmp_path / "broken.json").write_text("not json")
+
+    frame = load_frame([str(tmp_path)], {"a": "web"})
+
+    assert len(frame) == 3
+    days = {row["day"]: row for row in frame.rollup("day")}
+    assert days["2025-10-04"]["compliant"] == 1
+    assert days["unknown"]["total"] == 2
+    assert {row["group"] for row in frame.rollup("group")} == {"web", "ungrouped"}
@@ -0,0 +1,47 @@
+import pytest
+
+from utils.check_dsl import compile_check, check_expression
+from win_flags import win_flags
+
+
+@pytest.mark.parametrize("target", ["C:\\", 'say "hi"', "C:\\Windows\\\"x\"", "plain"])
+def test_default_expression_round_trips_any_target(target):
+    evaluator = compile_check(check_expression({"target_value": target}))
+    assert evaluator({"value": target})
+    assert not evaluator({"value": target + "x"})
+
+
+def test_regex_escapes_are_kept():
+    evaluator = compile_check(r'output matches "State\s+ON"')
+    assert evaluator({"output": "State      ON"})
+    assert not evaluator({"output": "State OFF"})
+
+
+def test_ranges_and_numbers():
+    assert compile_check("value in 1..5")({"value": '"3"'})
+    assert not compile_check("value in 1..5")({"value": "0"})
+    assert compile_check("value >= 12")({"value": "14"})
+
+
+@pytest.mark.parametrize("ok, output, compliant", [
+    (False, "The user name could not be found.\n\nMore help is available by typing NET HELPMSG 2221.", True),
+    (True, "User name    Administrator", False),
+    (False, "System error 5 has occurred.\n\nAccess is denied.", False),
+    (False, "Command not found.", False),
+    (False, "", False),
+])
+def test_administrator_rename_only_passes_when_the_account_is_gone(ok, output, compliant):
+    evaluator = compile_check(check_expression(win_flags["account_name"]["Administrator_Rename"]))
+    assert evaluator({"value": "N/A", "output": output, "ok": ok}) is compliant
+
+
+@pytest.mark.parametrize("output, compliant", [
+    ("Firewall Policy  BlockInbound,AllowOutbound\n" * 3, True),
+    ("Firewall Policy  BlockInboundAlways,AllowOutbound\n" * 3, True),
+    ("Firewall Policy  BlockInbound,AllowOutbound\n" + "Firewall Policy  AllowInbound,AllowOutbound\n" * 2, False),
+    ("Firewall Policy  AllowInbound,AllowOutbound\n" * 3, False),
+    ("", False),
+])
+def test_inbound_default_requires_every_profile_to_block(output, compliant):
+    evaluator = compile_check(check_expression(win_flags["firewall"]["inbound_default"]))
+    assert evaluator({"value": "N/A", "output": output, "ok": bool(output)}) is compliant
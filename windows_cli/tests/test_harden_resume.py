@@ -0,0 +1,157 @@
+import pytest
+
+import windows_engine
+from windows_engine import WindowsEngine
+from win_configs import resolve_baseline
+from win_flags import win_flags
+from utils import state, inf_compiler
+
+FLAGS = {name: flag for policies in win_flags.values() for name, flag in policies.items()}
+SET_COMMANDS = {flag["set_command"]: name for name, flag in FLAGS.items() if flag.get("set_command")}
+GET_COMMANDS = {flag["get_command"]: name for name, flag in FLAGS.items() if flag.get("get_command")}
+
+
+class Interrupted(Exception):
+    """Stands in for a crash or power loss in the middle of a harden run."""
+
+
+class FakeWindows:
+    """Just enough of secedit/sc/netsh/net user for the engine to apply and verify policies."""
+
+    def __init__(self):
+        self.applied = set()
+        self.fail = set()
+        self.interrupt_on = None
+        self.commands = []
+        self.backups = 0
+
+    def run(self, command, verbose=True):
+        self.commands.append(command)
+        if self.interrupt_on and self.interrupt_on in command:
+            self.interrupt_on = None
+            raise Interrupted(command)
+        if any(part in command for part in self.fail):
+            return False, "Access is denied."
+
+        if command.startswith("secedit /export"):
+            values = {name: flag["target_value"] if "secedit" in self.applied else "0"
+                      for name, flag in FLAGS.items() if flag.get("check_type") == "INF_PARSE"}
+            with open("temp_export.inf", "w") as f:
+                f.write("[System Access]\n" + "".join(f"{k} = {v}\n" for k, v in values.items()))
+            return True, ""
+        if command.startswith("secedit /configure"):
+            self.applied.add("secedit")
+            return True, ""
+        if command in SET_COMMANDS:
+            self.applied.add(SET_COMMANDS[command])
+            return True, ""
+
+        name = GET_COMMANDS[command]
+        done = name in self.applied
+        if FLAGS[name]["check_type"] == "SC_QUERY":
+            return True, f"START_TYPE         : {4 if done else 2}"
+        if name == "inbound_default":
+            return True, f"Firewall Policy  {'Block' if done else 'Allow'}Inbound,AllowOutbound\n" * 3
+        if FLAGS[name]["check_type"] == "NETSH_FW":
+            return True, f"State  {'ON' if done else 'OFF'}"
+        if done:
+            return False, "The user name could not be found.\nMore help is available by typing NET HELPMSG 2221."
+        return True, "User name    Administrator"
+
+    def backup(self):
+        self.backups += 1
+        return "backups/20250101_000000_security_backup.inf"
+
+    def ran(self, text):
+        return [command for command in self.commands if text in command]
+
+
+@pytest.fixture
+def system(tmp_path, monkeypatch):
+    fake = FakeWindows()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(state, "STATE_FILE", str(tmp_path / "protego_state.json"))
+    monkeypatch.setattr(inf_compiler, "CACHE_DIR", str(tmp_path / "inf_cache"))
+    monkeypatch.setattr(windows_engine, "backup_windows_state", fake.backup)
+    monkeypatch.setattr(windows_engine, "create_compliance_report", lambda *args, **kwargs: None)
+    monkeypatch.setattr(WindowsEngine, "_WindowsEngine__run_cli", lambda self, command, verbose=True: fake.run(command))
+    return fake
+
+
+def harden(level, **kwargs):
+    engine = WindowsEngine(resolve_baseline(level), level)
+    engine.harden_system(**kwargs)
+    return engine
+
+
+def test_interrupt_then_resume_runs_only_the_remaining_steps(system):
+    system.interrupt_on = "netsh advfirewall set"
+    with pytest.raises(Interrupted):
+        harden("medium")
+    run = state.load_state()["harden_run"]
+    assert run["completed"] == ["backup", "service_control:RemoteRegistry", "secedit"]
+
+    system.commands.clear()
+    engine = harden("medium", resume=True)
+
+    assert system.backups == 1
+    assert system.ran("sc config") == [] and system.ran("secedit /configure") == []
+    assert len(system.ran("netsh advfirewall set")) == 1
+    assert all(result["status"] == "COMPLIANT" for result in engine.results)
+    saved = state.load_state()
+    assert "harden_run" not in saved
+    assert saved["last_applied"] == {"level": "medium", "policies": resolve_baseline("medium")}
+
+
+def test_failed_steps_are_not_checkpointed_and_are_retried_on_resume(system):
+    system.fail = {"sc config", "secedit /configure"}
+    system.interrupt_on = "netsh advfirewall set"
+    with pytest.raises(Interrupted):
+        harden("medium")
+    assert state.load_state()["harden_run"]["completed"] == ["backup"]
+
+    system.fail.clear()
+    system.commands.clear()
+    harden("medium", resume=True)
+    assert len(system.ran("sc config")) == 1
+    assert len(system.ran("secedit /configure")) == 1
+
+
+def test_last_applied_only_records_verified_policies(system):
+    system.fail = {'sc config "bthserv"'}
+    harden("strict")
+    recorded = state.load_state()["last_applied"]["policies"]
+    assert "bthserv" not in recorded["service_control"]
+    assert "SharedAccess" in recorded["service_control"]
+
+    # The next delta harden retries only the failed policy
+    system.fail.clear()
+    system.commands.clear()
+    harden("strict")
+    assert system.ran("sc config") == ['sc config "bthserv" start= disabled']
+    recorded = state.load_state()["last_applied"]["policies"]
+    assert {category: set(names) for category, names in recorded.items()} == \
+        {category: set(names) for category, names in resolve_baseline("strict").items()}
+
+    # Everything verified: re-running is a no-op without a new backup
+    backups, system.commands[:] = system.backups, []
+    engine = harden("strict")
+    assert system.commands == [] and system.backups == backups
+    assert engine.results == []
+
+
+def test_pending_run_for_another_level_is_not_overwritten(system, capsys):
+    system.interrupt_on = "netsh advfirewall set"
+    with pytest.raises(Interrupted):
+        harden("medium")
+    pending = state.load_state()["harden_run"]
+
+    system.commands.clear()
+    harden("strict", resume=True)
+    assert "interrupted medium hardening run is pending" in capsys.readouterr().out
+    assert system.commands == [] and system.backups == 1
+    assert state.load_state()["harden_run"] == pending
+
+    harden("strict", full=True)
+    saved = state.load_state()
+    assert "harden_run" not in saved and saved["last_applied"]["level"] == "strict"
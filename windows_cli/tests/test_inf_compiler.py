@@ -0,0 +1,44 @@
+import os
+
+from utils.inf_compiler import render_inf, encode_inf, compile_inf
+from utils.offline_audit import iter_inf_entries
+
+CONFIG = {
+    "account_policy": ["MinimumPasswordLength", "LockoutBadCount"],
+    "service_control": ["RemoteRegistry"],
+}
+
+
+def test_render_inf_is_byte_stable():
+    expected = ("[Unicode]\r\nUnicode=yes\r\n"
+                "[System Access]\r\nMinimumPasswordLength = 12\r\nLockoutBadCount = 5\r\n"
+                "[Version]\r\nsignature=\"$CHICAGO$\"\r\nRevision=1\r\n")
+    assert render_inf(CONFIG) == expected
+    assert encode_inf(expected) == b"\xff\xfe" + expected.encode("utf-16-le")
+
+
+def test_render_inf_skips_levels_without_secedit_policies():
+    assert render_inf({"service_control": ["RemoteRegistry"]}) is None
+    assert compile_inf({"service_control": ["RemoteRegistry"]}, "services") is None
+
+
+def test_compile_inf_writes_once_and_reuses_the_cached_file(tmp_path):
+    path = compile_inf(CONFIG, "medium", str(tmp_path))
+    with open(path, "rb") as f:
+        assert f.read() == encode_inf(render_inf(CONFIG))
+    assert os.path.basename(path).startswith("protego_medium_")
+
+    os.utime(path, (0, 0))
+    assert compile_inf(CONFIG, "medium", str(tmp_path)) == path
+    assert os.path.getmtime(path) == 0  # reused, not rewritten
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+    other = compile_inf({"account_policy": ["MinimumPasswordLength"]}, "easy", str(tmp_path))
+    assert other != path
+
+
+def test_compiled_inf_parses_back(tmp_path):
+    path = compile_inf(CONFIG, "medium", str(tmp_path))
+    entries = {(section, key): value for section, key, value in iter_inf_entries(path)}
+    assert entries[("System Access", "MinimumPasswordLength")] == "12"
+    assert entries[("System Access", "LockoutBadCount")] == "5"
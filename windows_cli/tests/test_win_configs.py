@@ -0,0 +1,45 @@
+import pytest
+
+from win_configs import BASELINES, resolve_baseline, compute_delta
+from win_flags import win_flags
+
+
+@pytest.mark.parametrize("name", list(BASELINES))
+def test_resolved_baselines_only_contain_catalog_policies(name):
+    for category, policies in resolve_baseline(name).items():
+        assert policies
+        assert all(policy in win_flags[category] for policy in policies)
+
+
+def test_resolve_baseline_includes_everything_it_extends():
+    easy, medium, strict = (resolve_baseline(name) for name in ("easy", "medium", "strict"))
+    for lower, higher in ((easy, medium), (medium, strict)):
+        for category, policies in lower.items():
+            assert set(policies) <= set(higher[category])
+
+
+def test_resolve_baseline_rejects_unknown_names_and_cycles(monkeypatch):
+    with pytest.raises(ValueError):
+        resolve_baseline("nope")
+    monkeypatch.setitem(BASELINES, "a", {"extends": "b", "policies": {}})
+    monkeypatch.setitem(BASELINES, "b", {"extends": "a", "policies": {}})
+    with pytest.raises(ValueError, match="cycle"):
+        resolve_baseline("a")
+
+
+def test_resolve_baseline_drops_policies_missing_from_the_catalog(monkeypatch):
+    monkeypatch.setitem(BASELINES, "custom", {"extends": "easy", "policies": {
+        "account_policy": ["NotARealPolicy"], "no_such_category": ["X"]}})
+    assert resolve_baseline("custom") == resolve_baseline("easy")
+
+
+@pytest.mark.parametrize("name", list(BASELINES))
+def test_delta_against_the_same_level_is_empty(name):
+    assert compute_delta(resolve_baseline(name), resolve_baseline(name)) == {}
+
+
+def test_delta_only_lists_missing_policies():
+    delta = compute_delta(resolve_baseline("medium"), resolve_baseline("strict"))
+    assert delta["account_policy"] == ["PasswordHistorySize"]
+    assert "RemoteRegistry" not in delta["service_control"]
+    assert compute_delta(resolve_baseline("strict"), resolve_baseline("easy")) == {}
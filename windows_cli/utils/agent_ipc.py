@@ -0,0 +1,83 @@
+# PROTEGO_WINDOWS/utils/agent_ipc.py
+# Shared by the agent and the thin client; keep this stdlib-only so the client starts fast.
+
+import os
+import sys
+import json
+import secrets
+import tempfile
+import subprocess
+from multiprocessing.connection import Client
+
+# Anchored to the install directory (not the cwd) so the agent and clients find the same key
+AUTHKEY_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backups", "agent.key")
+
+# The agent serves the Windows engine only. The AF_UNIX branch lets the IPC layer and the
+# agent's request handling be exercised off Windows; main.py does not start the agent there.
+if sys.platform == "win32":
+    AGENT_ADDRESS = r"\\.\pipe\protego-agent"
+    AGENT_FAMILY = "AF_PIPE"
+else:
+    AGENT_ADDRESS = os.path.join(tempfile.gettempdir(), "protego-agent.sock")
+    AGENT_FAMILY = "AF_UNIX"
+
+
+class AgentError(Exception):
+    """Raised by the client when the agent returns a JSON-RPC error."""
+
+
+def _restrict_to_administrators(path):
+    """Windows ignores POSIX modes, so the key gets an explicit ACL: Administrators and SYSTEM only."""
+    try:
+        subprocess.run(["icacls", path, "/inheritance:r", "/grant:r", "*S-1-5-32-544:F", "*S-1-5-18:F"],
+                       check=True, capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        os.remove(path)
+        raise PermissionError(f"Could not restrict access to {path}: {getattr(e, 'stderr', e)}")
+
+
+def create_authkey():
+    """Generates a fresh key readable only by the agent's user (Administrators/SYSTEM on Windows);
+    clients must present it."""
+    os.makedirs(os.path.dirname(AUTHKEY_FILE), exist_ok=True)
+    key = secrets.token_hex(32)
+    fd = os.open(AUTHKEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.close(fd)
+    # Access is locked down before any key material is written
+    if sys.platform == "win32":
+        _restrict_to_administrators(AUTHKEY_FILE)
+    else:
+        os.chmod(AUTHKEY_FILE, 0o600)  # the os.open mode only applies when the file is created
+    with open(AUTHKEY_FILE, 'w') as f:
+        f.write(key)
+    return key.encode()
+
+
+def read_authkey():
+    with open(AUTHKEY_FILE, 'r') as f:
+        return f.read().strip().encode()
+
+
+def send_message(conn, message):
+    conn.send_bytes(json.dumps(message).encode('utf-8'))
+
+
+def recv_message(conn):
+    return json.loads(conn.recv_bytes().decode('utf-8'))
+
+
+def call(method, params=None, conn=None):
+    """Sends one JSON-RPC request to the agent and returns its result."""
+    own_conn = conn is None
+    if own_conn:
+        conn = Client(AGENT_ADDRESS, family=AGENT_FAMILY, authkey=read_authkey())
+    try:
+        send_message(conn, {"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}})
+        response = recv_message(conn)
+    finally:
+        if own_conn:
+            conn.close()
+
+    if "error" in response:
+        raise AgentError(response["error"]["message"])
+    return response["result"]
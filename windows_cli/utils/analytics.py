@@ -0,0 +1,203 @@
+# PROTEGO_WINDOWS/utils/analytics.py
+
+import os
+import re
+import csv
+import json
+import datetime
+
+# NumPy is only needed for fleet analytics, not for check/harden on a host.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+COMPLIANT_STATUSES = ('COMPLIANT', 'SUCCESS')
+UNASSESSED_STATUSES = ('NOT-ASSESSED',)
+ROLLUP_COLUMNS = ("policy", "level", "host", "group", "day")
+ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}([ T]|$)')
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Fleet analytics requires NumPy. Install it with 'pip install numpy'.")
+
+
+def iter_report_records(path, host=None):
+    """Streams result records out of a TXT report written by create_compliance_report."""
+    host = host or os.path.basename(os.path.dirname(os.path.abspath(path))) or "local"
+    timestamp = None
+    level = "N/A"
+    record = None
+
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if line.startswith("Date: "):
+                timestamp = line[len("Date: "):].strip()
+            elif line.startswith("Hardening Level: "):
+                level = line[len("Hardening Level: "):].strip()
+            elif line.startswith("POLICY: "):
+                record = {'host': host, 'level': level, 'timestamp': timestamp,
+                          'policy': line[len("POLICY: "):].strip()}
+            elif record is not None and line.startswith("  Status: "):
+                record['status'] = line[len("  Status: "):].strip()
+            elif record is not None and line.startswith("  Current/Final: "):
+                record['current'] = line[len("  Current/Final: "):].strip()
+            elif record is not None and line.startswith("  Target Value: "):
+                record['target'] = line[len("  Target Value: "):].strip()
+                yield record
+                record = None
+
+
+def iter_json_records(path, level="N/A"):
+    """Yields records from a JSON results file (e.g. 'audit-offline --json').
+
+    Records keep their own timestamp (audit-offline writes the backup time); the file's
+    mtime is only used for records that carry none. Other JSON files that end up in a
+    collected tree (a --groups file, protego_state.json) are skipped with a warning.
+    """
+    try:
+        with open(path, 'r') as f:
+            records = json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        print(f"[WARNING] Skipping {path}: not valid JSON ({e}).")
+        return
+    if not isinstance(records, list):
+        print(f"[WARNING] Skipping {path}: not a list of result records.")
+        return
+
+    mtime, skipped = None, 0
+    for record in records:
+        if not isinstance(record, dict) or 'policy' not in record:
+            skipped += 1
+            continue
+        record.setdefault('level', level)
+        if not record.get('timestamp'):
+            if mtime is None:
+                mtime = datetime.datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d %H:%M:%S')
+            record['timestamp'] = mtime
+        yield record
+    if skipped:
+        print(f"[WARNING] Skipped {skipped} entries without a 'policy' in {path}.")
+
+
+def iter_result_files(paths):
+    """Expands directories into the report (.txt) and results (.json) files they contain."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.endswith(('.txt', '.json')):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def _day_column(timestamps):
+    """Categorical day column. Each distinct timestamp string is parsed once; missing or
+    unparseable ones fall into an 'unknown' day instead of failing the whole frame."""
+    unique, inverse = np.unique(np.array(timestamps, dtype=object).astype(str), return_inverse=True)
+    days = []
+    for stamp in unique:
+        day = "unknown"
+        if ISO_DATE_RE.match(stamp):
+            try:
+                day = str(np.datetime64(stamp.replace(' ', 'T'), 's').astype('datetime64[D]'))
+            except ValueError:
+                pass
+        days.append(day)
+    day_categories, day_index = np.unique(np.array(days), return_inverse=True)
+    return day_categories, day_index.astype(np.int32)[inverse]
+
+
+class ComplianceFrame:
+    """Columnar, categorically-encoded view over many compliance result records."""
+
+    def __init__(self, records, host_groups=None):
+        _require_numpy()
+        hosts, policies, levels, statuses, timestamps = [], [], [], [], []
+        for record in records:
+            hosts.append(record.get('host', 'local'))
+            policies.append(record['policy'])
+            levels.append(record.get('level', 'N/A'))
+            statuses.append(record.get('status', 'N/A'))
+            timestamps.append(record.get('timestamp') or '')
+
+        # Categorical encoding: each column becomes (categories, int32 codes)
+        self.columns = {}
+        for name, values in (("host", hosts), ("policy", policies), ("level", levels), ("status", statuses)):
+            categories, codes = np.unique(np.array(values, dtype=object).astype(str), return_inverse=True)
+            self.columns[name] = (categories, codes.astype(np.int32))
+
+        status_categories, status_codes = self.columns["status"]
+        self.compliant = np.isin(status_categories, COMPLIANT_STATUSES)[status_codes]
+        self.assessed = ~np.isin(status_categories, UNASSESSED_STATUSES)[status_codes]
+
+        self.columns["day"] = _day_column(timestamps)
+
+        # Host groups are mapped once per distinct host, then broadcast through the host codes
+        host_categories, host_codes = self.columns["host"]
+        host_groups = host_groups or {}
+        group_of_host = np.array([host_groups.get(h, "ungrouped") for h in host_categories], dtype=object).astype(str)
+        group_categories, group_index = np.unique(group_of_host, return_inverse=True)
+        self.columns["group"] = (group_categories, group_index.astype(np.int32)[host_codes])
+
+    def __len__(self):
+        return len(self.compliant)
+
+    def rollup(self, by="policy"):
+        """Returns [{by, total, assessed, compliant, compliance_rate}] grouped by one column."""
+        if by not in ROLLUP_COLUMNS:
+            raise ValueError(f"Unknown rollup column '{by}'. Choose from {', '.join(ROLLUP_COLUMNS)}.")
+
+        categories, codes = self.columns[by]
+        size = len(categories)
+        total = np.bincount(codes, minlength=size)
+        assessed = np.bincount(codes, weights=self.assessed, minlength=size).astype(np.int64)
+        compliant = np.bincount(codes, weights=self.compliant & self.assessed, minlength=size).astype(np.int64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.where(assessed > 0, compliant / np.maximum(assessed, 1), 0.0)
+
+        return [
+            {by: str(categories[i]), 'total': int(total[i]), 'assessed': int(assessed[i]),
+             'compliant': int(compliant[i]), 'compliance_rate': round(float(rate[i]), 4)}
+            for i in range(size)
+        ]
+
+
+def load_frame(paths, host_groups=None, level="N/A"):
+    """Loads every report/JSON result file under paths into a ComplianceFrame."""
+    def records():
+        for path in iter_result_files(paths):
+            if path.endswith('.json'):
+                yield from iter_json_records(path, level)
+            else:
+                yield from iter_report_records(path)
+
+    return ComplianceFrame(records(), host_groups)
+
+
+def export_rollup(rows, output_path):
+    """Writes a rollup to CSV, or to Parquet when the path ends in .parquet (requires pyarrow)."""
+    if not rows:
+        print("No results to export.")
+        return
+
+    if output_path.endswith('.parquet'):
+        if pa is None:
+            raise ImportError("Parquet export requires pyarrow. Install it with 'pip install pyarrow'.")
+        table = pa.Table.from_pylist(rows)
+        pq.write_table(table, output_path)
+    else:
+        with open(output_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+    print(f"\nSummary exported to: {output_path}")
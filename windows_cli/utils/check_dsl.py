@@ -0,0 +1,227 @@
+# PROTEGO_WINDOWS/utils/check_dsl.py
+#
+# Small declarative language for policy checks, e.g.
+#     value >= 12
+#     value in 1..5
+#     value in ["4", "DISABLED"]
+#     output matches "State\s+ON"
+#     not ok
+#     inf("System Access", "PasswordComplexity") == 1 and value >= 14
+#
+# Sources: value (probed current value), output (raw probe output), ok (probe command succeeded),
+# inf("Section", "Key") (a value from the secedit export). Expressions are parsed once and
+# compiled into nested closures taking a context dict.
+
+import re
+from functools import lru_cache
+
+TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<number>-?\d+(?:\.\d+)?)   |
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*') |
+        (?P<op>==|!=|>=|<=|>|<|\.\.|[()\[\],])  |
+        (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    )''', re.VERBOSE)
+
+COMPARISONS = ("==", "!=", ">=", "<=", ">", "<")
+SOURCES = ("value", "output", "ok")
+
+
+def _tokenize(text):
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Unexpected character at position {pos}: {text[pos:pos + 10]!r}")
+        kind = match.lastgroup
+        raw = match.group(kind)
+        if kind == "string":
+            # Only quotes and backslashes are escaped; other backslashes (\s, \d) are kept for regular expressions
+            raw = re.sub(r'\\(["\'\\])', r'\1', raw[1:-1])
+        tokens.append((kind, raw))
+        pos = match.end()
+    return tokens
+
+
+def _number(value):
+    """Returns value as a float when it looks numeric (secedit values like '12' or '"12"'), else None."""
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        return float(str(value).strip().strip('"'))
+    except ValueError:
+        return None
+
+
+def _equal(left, right):
+    left_num, right_num = _number(left), _number(right)
+    if left_num is not None and right_num is not None:
+        return left_num == right_num
+    if isinstance(left, bool) or isinstance(right, bool):
+        return left is right or str(left).upper() == str(right).upper()
+    return str(left).strip().upper() == str(right).strip().upper()
+
+
+def _compare(op, left, right):
+    if op == "==":
+        return _equal(left, right)
+    if op == "!=":
+        return not _equal(left, right)
+    left_num, right_num = _number(left), _number(right)
+    if left_num is None or right_num is None:
+        return False  # ordering is only defined for numbers
+    return {">=": left_num >= right_num, "<=": left_num <= right_num,
+            ">": left_num > right_num, "<": left_num < right_num}[op]
+
+
+class _Parser:
+    def __init__(self, text):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+        self.inf_keys = set()
+
+    def peek(self, offset=0):
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token == (None, None) or (expected and token[1] != expected):
+            raise ValueError(f"Expected {expected or 'more input'}, got {token[1]!r}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unexpected token {self.peek()[1]!r}")
+        return node
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.peek() == ("name", "or"):
+            self.take()
+            left, right = node, self.parse_and()
+            node = lambda ctx, left=left, right=right: left(ctx) or right(ctx)
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.peek() == ("name", "and"):
+            self.take()
+            left, right = node, self.parse_not()
+            node = lambda ctx, left=left, right=right: left(ctx) and right(ctx)
+        return node
+
+    def parse_not(self):
+        if self.peek() == ("name", "not"):
+            self.take()
+            inner = self.parse_not()
+            return lambda ctx: not inner(ctx)
+        if self.peek() == ("op", "("):
+            self.take("(")
+            node = self.parse_or()
+            self.take(")")
+            return node
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        left = self.parse_operand()
+        kind, token = self.peek()
+
+        if kind == "op" and token in COMPARISONS:
+            self.take()
+            right = self.parse_operand()
+            return lambda ctx: _compare(token, left(ctx), right(ctx))
+
+        if token == "matches":
+            self.take()
+            kind, pattern = self.take()
+            if kind != "string":
+                raise ValueError("'matches' expects a quoted regular expression")
+            try:
+                regex = re.compile(pattern, re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Invalid regular expression {pattern!r}: {e}")
+            return lambda ctx: bool(regex.search(str(left(ctx))))
+
+        if token == "in":
+            self.take()
+            if self.peek() == ("op", "["):
+                self.take("[")
+                options = [self.parse_literal()]
+                while self.peek() == ("op", ","):
+                    self.take()
+                    options.append(self.parse_literal())
+                self.take("]")
+                return lambda ctx: any(_equal(left(ctx), option) for option in options)
+            low = self.parse_literal()
+            self.take("..")
+            high = self.parse_literal()
+            low, high = _number(low), _number(high)
+            if low is None or high is None:
+                raise ValueError("Ranges must be numeric, e.g. 'value in 1..5'")
+
+            def in_range(ctx):
+                number = _number(left(ctx))
+                return number is not None and low <= number <= high
+            return in_range
+
+        # A bare operand is truthy, e.g. 'ok'
+        return lambda ctx: bool(left(ctx))
+
+    def parse_literal(self):
+        kind, token = self.take()
+        if kind == "number":
+            return token
+        if kind == "string":
+            return token
+        if kind == "name" and token in ("true", "false"):
+            return token == "true"
+        raise ValueError(f"Expected a literal, got {token!r}")
+
+    def parse_operand(self):
+        kind, token = self.peek()
+        if kind == "name" and token in SOURCES:
+            self.take()
+            return lambda ctx: ctx.get(token)
+        if kind == "name" and token == "inf":
+            self.take()
+            self.take("(")
+            section = self.take()[1]
+            self.take(",")
+            key = self.take()[1]
+            self.take(")")
+            self.inf_keys.add((section, key))
+            return lambda ctx: ctx.get("inf", {}).get((section, key), "N/A")
+        literal = self.parse_literal()
+        return lambda ctx: literal
+
+
+@lru_cache(maxsize=None)
+def compile_check(expression):
+    """Parses expression once and returns evaluator(ctx) -> bool.
+
+    evaluator.inf_keys lists the (section, key) pairs it reads through inf(...),
+    so callers can fetch them in the same secedit export as everything else.
+    """
+    try:
+        parser = _Parser(expression)
+        node = parser.parse()
+    except ValueError as e:
+        raise ValueError(f"Invalid check expression {expression!r}: {e}") from None
+
+    def evaluator(ctx):
+        return bool(node(ctx))
+    evaluator.inf_keys = frozenset(parser.inf_keys)
+    evaluator.expression = expression
+    return evaluator
+
+
+def check_expression(flag_data):
+    """The flag's 'check' expression, or exact equality with its target_value when none is given."""
+    if flag_data.get('check'):
+        return flag_data['check']
+    target = str(flag_data['target_value']).replace('\\', '\\\\').replace('"', '\\"')
+    return f'value == "{target}"'
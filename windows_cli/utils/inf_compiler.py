@@ -0,0 +1,96 @@
+# PROTEGO_WINDOWS/utils/inf_compiler.py
+
+import os
+import hashlib
+import subprocess
+
+from win_flags import win_flags
+
+CACHE_DIR = os.path.join(os.getcwd(), "inf_cache")
+
+# secedit expects these framing sections around the policy sections
+INF_HEADER = ["[Unicode]", "Unicode=yes"]
+INF_FOOTER = ["[Version]", 'signature="$CHICAGO$"', "Revision=1"]
+
+# Compiled templates keyed by content hash for the lifetime of the process
+_compiled = {}
+
+
+def render_inf(target_config):
+    """Renders every secedit-backed policy in target_config into INF text.
+
+    Policies are grouped by their win_flags 'section' (System Access, Event Audit,
+    Registry Values, ...) in config order, so the same config always renders the same text.
+    """
+    sections = {}
+    for category, policies in target_config.items():
+        for policy_name in policies:
+            flag_data = win_flags.get(category, {}).get(policy_name)
+            if not flag_data or not flag_data.get('section'):
+                continue
+            key = flag_data.get('key', policy_name)
+            # Write Key = Value (value is raw, no quotes for numeric values)
+            value = flag_data.get('inf_value', flag_data['target_value'])
+            sections.setdefault(flag_data['section'], []).append(f"{key} = {value}")
+
+    if not sections:
+        return None
+
+    lines = list(INF_HEADER)
+    for section, entries in sections.items():
+        lines.append(f"[{section}]")
+        lines.extend(entries)
+    lines.extend(INF_FOOTER)
+    return "\r\n".join(lines) + "\r\n"
+
+
+def encode_inf(text):
+    """secedit requires UTF-16 LE with a BOM and CRLF line endings."""
+    return b'\xff\xfe' + text.encode('utf-16-le')
+
+
+def compile_inf(target_config, level, cache_dir=None):
+    """Returns the path of the cached INF template for target_config, generating it only once.
+
+    Templates are content-addressed (protego_<level>_<sha256>.inf), so a catalog change
+    produces a new file while unchanged levels keep reusing the existing one.
+    """
+    text = render_inf(target_config)
+    if text is None:
+        return None
+
+    data = encode_inf(text)
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    cache_dir = cache_dir or CACHE_DIR
+
+    inf_path = os.path.join(cache_dir, f"protego_{level}_{digest}.inf")
+    if _compiled.get(digest) == inf_path or os.path.exists(inf_path):
+        _compiled[digest] = inf_path
+        return inf_path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = inf_path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, inf_path)
+
+    _compiled[digest] = inf_path
+    return inf_path
+
+
+def compile_sdb(inf_path):
+    """Imports a cached INF into a security database next to it, once. Returns the .sdb path or None."""
+    sdb_path = os.path.splitext(inf_path)[0] + ".sdb"
+    if os.path.exists(sdb_path):
+        return sdb_path
+
+    try:
+        subprocess.run(f'secedit /import /db "{sdb_path}" /cfg "{inf_path}" /overwrite /quiet',
+                       shell=True, check=True, capture_output=True, text=True,
+                       creationflags=subprocess.CREATE_NO_WINDOW)
+    except subprocess.CalledProcessError as e:
+        print(f"[WARNING] Could not compile security database from {os.path.basename(inf_path)}. {e.stderr}")
+        if os.path.exists(sdb_path):
+            os.remove(sdb_path)
+        return None
+    return sdb_path
@@ -0,0 +1,208 @@
+# PROTEGO_WINDOWS/utils/offline_audit.py
+
+import os
+import re
+import json
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from win_flags import win_flags
+from utils.results import ComplianceResult, Status
+from utils.check_dsl import compile_check, check_expression
+
+# File name suffixes produced by utils/rollback.backup_windows_state()
+INF_SUFFIX = "security_backup.inf"
+REG_SUFFIX = "system_registry_backup.reg"
+ARTIFACT_EXTENSIONS = (".inf", ".reg")
+# Timestamp prefix backup_windows_state() puts on every artifact name
+SNAPSHOT_TIME_FORMAT = "%Y%m%d_%H%M%S"
+
+REG_KEY_PREFIXES = {
+    "HKEY_LOCAL_MACHINE\\": "MACHINE\\",
+    "HKLM\\": "MACHINE\\",
+}
+
+
+def _open_text(path):
+    """Opens an exported artifact, detecting UTF-16 (secedit/reg export) vs UTF-8."""
+    with open(path, 'rb') as f:
+        bom = f.read(2)
+    encoding = 'utf-16' if bom in (b'\xff\xfe', b'\xfe\xff') else 'utf-8-sig'
+    return open(path, 'r', encoding=encoding, errors='replace')
+
+
+def _normalize_inf_value(section, value):
+    """Strips the secedit registry type prefix ('4,1' -> '1') and surrounding quotes."""
+    value = value.strip()
+    if section == "Registry Values" and ',' in value:
+        value = value.split(',', 1)[1]
+    return value.strip('"')
+
+
+def _normalize_reg_value(value):
+    """Converts .reg data ('dword:00000005', '"text"') to the form secedit exports."""
+    value = value.strip()
+    if value.startswith('dword:'):
+        return str(int(value[6:], 16))
+    return value.strip('"')
+
+
+def iter_inf_entries(path):
+    """Streams (section, key, value) tuples out of a secedit INF export."""
+    section = None
+    with _open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith(';'):
+                continue
+            if line.startswith('[') and line.endswith(']'):
+                section = line[1:-1]
+                continue
+            if '=' in line and section:
+                key, value = line.split('=', 1)
+                yield section, key.strip(), _normalize_inf_value(section, value)
+
+
+def iter_reg_values(path):
+    """Streams registry values out of a .reg export as secedit 'Registry Values' entries."""
+    key_path = None
+    with _open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('[') and line.endswith(']'):
+                key_path = line[1:-1]
+                for prefix, replacement in REG_KEY_PREFIXES.items():
+                    if key_path.upper().startswith(prefix.upper()):
+                        key_path = replacement + key_path[len(prefix):]
+                        break
+                continue
+            match = re.match(r'^"(.+?)"=(.*)$', line)
+            if match and key_path:
+                yield "Registry Values", f"{key_path}\\{match.group(1)}", _normalize_reg_value(match.group(2))
+
+
+def offline_lookups(target_config):
+    """Returns the (section, key) pairs needed to evaluate target_config from artifacts,
+    including any read by check expressions through inf(...)."""
+    lookups = set()
+    for category, policies in target_config.items():
+        for policy_name in policies:
+            flag_data = win_flags.get(category, {}).get(policy_name)
+            if flag_data and flag_data.get('section'):
+                lookups.add((flag_data['section'], flag_data.get('key', policy_name)))
+                lookups |= compile_check(check_expression(flag_data)).inf_keys
+    return lookups
+
+
+def group_artifacts(paths):
+    """Expands directories (recursively, e.g. one subfolder per host) and groups .inf/.reg
+    files that belong to the same backup snapshot."""
+    snapshots = {}
+    for path in paths:
+        if os.path.isdir(path):
+            files = [os.path.join(root, name)
+                     for root, _, names in sorted(os.walk(path)) for name in sorted(names)]
+        else:
+            files = [path]
+
+        for file_path in files:
+            name = os.path.basename(file_path)
+            if not name.lower().endswith(ARTIFACT_EXTENSIONS):
+                continue
+            snapshot = name
+            for suffix in (INF_SUFFIX, REG_SUFFIX):
+                if name.endswith(suffix):
+                    snapshot = name[:-len(suffix)].rstrip('_') or name
+                    break
+            snapshot_key = os.path.join(os.path.dirname(file_path), snapshot)
+            snapshots.setdefault(snapshot_key, []).append(file_path)
+    return snapshots
+
+
+def snapshot_host(snapshot):
+    """The host a snapshot belongs to: the name of the directory holding its artifacts."""
+    return os.path.basename(os.path.dirname(os.path.abspath(snapshot))) or "local"
+
+
+def snapshot_timestamp(snapshot):
+    """The backup time encoded in the snapshot name ('20251004_002821'), or None if it has none."""
+    try:
+        taken = datetime.datetime.strptime(os.path.basename(snapshot)[:15], SNAPSHOT_TIME_FORMAT)
+    except ValueError:
+        return None
+    return taken.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def audit_snapshot(snapshot, files, target_config):
+    """Evaluates target_config against one snapshot's exported files. Never touches the live system."""
+    lookups = offline_lookups(target_config)
+    found = {}
+
+    for file_path in files:
+        if lookups and len(found) == len(lookups):
+            break
+        entries = iter_reg_values(file_path) if file_path.lower().endswith('.reg') else iter_inf_entries(file_path)
+        for section, key, value in entries:
+            if (section, key) in lookups and (section, key) not in found:
+                found[(section, key)] = value
+                # Stop reading once every requested value has been seen
+                if len(found) == len(lookups):
+                    break
+
+    results = []
+    for category, policies in target_config.items():
+        for policy_name in policies:
+            flag_data = win_flags.get(category, {}).get(policy_name)
+            if not flag_data: continue
+
+            target_value = flag_data.get('check', flag_data['target_value'])
+            if not flag_data.get('section'):
+                status = Status.NOT_ASSESSED
+                current_value = "Not available offline"
+            else:
+                key = (flag_data['section'], flag_data.get('key', policy_name))
+                current_value = found.get(key, "N/A")
+                context = {'value': current_value, 'output': current_value, 'ok': key in found, 'inf': found}
+                evaluator = compile_check(check_expression(flag_data))
+                status = Status.COMPLIANT if evaluator(context) else Status.NON_COMPLIANT
+
+            results.append(ComplianceResult(policy_name, status, current_value, target_value))
+    return snapshot, results
+
+
+def _audit_snapshot_job(job):
+    return audit_snapshot(*job)
+
+
+def audit_offline(paths, target_config, workers=None):
+    """Audits every snapshot found under paths, spreading files across a process pool."""
+    snapshots = group_artifacts(paths)
+    jobs = [(snapshot, files, target_config) for snapshot, files in sorted(snapshots.items())]
+
+    if len(jobs) <= 1 or workers == 1:
+        return [audit_snapshot(*job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        return list(pool.map(_audit_snapshot_job, jobs, chunksize=chunksize))
+
+
+def write_audit_json(audit_results, output_path):
+    """Writes one flat record per (snapshot, policy) for fleet-side aggregation.
+
+    Each record carries the host (the snapshot's directory), the snapshot name and, when the
+    name encodes it, the backup timestamp so trends follow when the backup was taken.
+    """
+    with open(output_path, 'w') as f:
+        records = []
+        for snapshot, results in audit_results:
+            metadata = {'host': snapshot_host(snapshot), 'snapshot': os.path.basename(snapshot)}
+            timestamp = snapshot_timestamp(snapshot)
+            if timestamp:
+                metadata['timestamp'] = timestamp
+            for result in results:
+                record = dict(metadata)
+                record.update(result)
+                records.append(record)
+        json.dump(records, f, indent=2)
+    print(f"\nAudit results written to: {output_path}")
@@ -0,0 +1,201 @@
+# PROTEGO_WINDOWS/utils/report_store.py
+
+import os
+import html
+import json
+import socket
+import sqlite3
+import hashlib
+import datetime
+from contextlib import closing
+from string import Template
+
+REPORT_DB = os.path.join(os.getcwd(), "reports", "protego_reports.db")
+COMPLIANT_STATUSES = ('COMPLIANT', 'SUCCESS')
+# Left out of every total, as in utils/analytics, so they never count against a host or policy
+UNASSESSED_STATUSES = ('NOT-ASSESSED',)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY, host TEXT, level TEXT, command TEXT, timestamp TEXT,
+    total INTEGER, compliant INTEGER
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY, run_id INTEGER, host TEXT, policy TEXT, status TEXT,
+    current TEXT, target TEXT, timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_host ON results(host);
+CREATE INDEX IF NOT EXISTS idx_results_policy ON results(policy);
+CREATE INDEX IF NOT EXISTS idx_results_timestamp ON results(timestamp);
+
+-- Aggregates maintained incrementally so dashboards never rescan old results
+CREATE TABLE IF NOT EXISTS policy_summary (
+    policy TEXT PRIMARY KEY, total INTEGER, compliant INTEGER, last_seen TEXT
+);
+CREATE TABLE IF NOT EXISTS host_latest (
+    host TEXT PRIMARY KEY, run_id INTEGER, level TEXT, timestamp TEXT, total INTEGER, compliant INTEGER
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+-- Content keys of imported runs, so importing the same results twice is a no-op
+CREATE TABLE IF NOT EXISTS imports (key TEXT PRIMARY KEY, run_id INTEGER);
+"""
+
+HTML_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Protego Fleet Compliance</title>
+<style>body{font-family:sans-serif}table{border-collapse:collapse}td,th{border:1px solid #999;padding:4px 8px}</style>
+</head>
+<body>
+<h1>Protego Fleet Compliance</h1>
+<p>Generated: $generated &middot; Hosts: $host_count &middot; Results: $result_count</p>
+<h2>Hosts (latest run)</h2>
+<table><tr><th>Host</th><th>Level</th><th>Last Run</th><th>Compliant</th><th>Rate</th></tr>
+$host_rows
+</table>
+<h2>Policies (all runs)</h2>
+<table><tr><th>Policy</th><th>Compliant</th><th>Total</th><th>Rate</th><th>Last Seen</th></tr>
+$policy_rows
+</table>
+</body>
+</html>
+""")
+
+MARKDOWN_TEMPLATE = Template("""# Protego Fleet Compliance
+
+Generated: $generated | Hosts: $host_count | Results: $result_count
+
+## Hosts (latest run)
+
+| Host | Level | Last Run | Compliant | Rate |
+|---|---|---|---|---|
+$host_rows
+
+## Policies (all runs)
+
+| Policy | Compliant | Total | Rate | Last Seen |
+|---|---|---|---|---|
+$policy_rows
+""")
+
+
+def connect(db_path=None):
+    """Opens the store. Use as 'with closing(connect()) as conn, conn:' so it is committed and closed."""
+    db_path = db_path or REPORT_DB
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def record_results(check_results, command, level="strict", host=None, timestamp=None, db_path=None, import_key=None):
+    """Appends one run's results to the store. Returns the run id.
+
+    With import_key, a run already stored under the same key is skipped and None is returned.
+    """
+    host = host or socket.gethostname()
+    timestamp = timestamp or datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    rows = [(host, result['policy'], str(result.get('status', 'N/A')), str(result.get('current', 'N/A')),
+             str(result.get('target', 'N/A')), timestamp) for result in check_results]
+    assessed = sum(1 for row in rows if row[2] not in UNASSESSED_STATUSES)
+    compliant = sum(1 for row in rows if row[2] in COMPLIANT_STATUSES)
+
+    with closing(connect(db_path)) as conn, conn:
+        if import_key and conn.execute("SELECT 1 FROM imports WHERE key = ?", (import_key,)).fetchone():
+            return None
+        run_id = conn.execute(
+            "INSERT INTO runs (host, level, command, timestamp, total, compliant) VALUES (?, ?, ?, ?, ?, ?)",
+            (host, level, command, timestamp, assessed, compliant)).lastrowid
+        if import_key:
+            conn.execute("INSERT INTO imports (key, run_id) VALUES (?, ?)", (import_key, run_id))
+        conn.executemany(
+            "INSERT INTO results (run_id, host, policy, status, current, target, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(run_id,) + row for row in rows])
+        conn.execute(
+            """INSERT INTO host_latest (host, run_id, level, timestamp, total, compliant) VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(host) DO UPDATE SET run_id=excluded.run_id, level=excluded.level,
+               timestamp=excluded.timestamp, total=excluded.total, compliant=excluded.compliant
+               WHERE excluded.timestamp >= host_latest.timestamp""",
+            (host, run_id, level, timestamp, assessed, compliant))
+    return run_id
+
+
+def import_json_results(path, command="IMPORT", level="N/A", db_path=None):
+    """Imports flat per-host records (e.g. 'audit-offline --json') as one run per (host, timestamp).
+
+    Runs are keyed by their content, so re-importing a file (or the same results from another
+    file) does not count them again. Returns (runs imported, runs already in the store).
+    """
+    with open(path, 'r') as f:
+        records = json.load(f)
+
+    runs = {}
+    for record in records:
+        runs.setdefault((record.get('host', 'unknown'), record.get('timestamp')), []).append(record)
+
+    imported = skipped = 0
+    for (host, timestamp), run_records in runs.items():
+        import_key = hashlib.sha256(json.dumps(run_records, sort_keys=True).encode('utf-8')).hexdigest()
+        run_id = record_results(run_records, command, run_records[0].get('level', level), host, timestamp,
+                                db_path=db_path, import_key=import_key)
+        if run_id is None:
+            skipped += 1
+        else:
+            imported += 1
+    return imported, skipped
+
+
+def _fold_new_results(conn):
+    """Adds results newer than the last render to policy_summary; older rows are never re-read."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'rendered_upto'").fetchone()
+    rendered_upto = int(row[0]) if row else 0
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM results").fetchone()[0]
+    if max_id <= rendered_upto:
+        return
+
+    compliant = ", ".join("?" for _ in COMPLIANT_STATUSES)
+    unassessed = ", ".join("?" for _ in UNASSESSED_STATUSES)
+    conn.execute(
+        f"""INSERT INTO policy_summary (policy, total, compliant, last_seen)
+            SELECT policy, SUM(status NOT IN ({unassessed})), SUM(status IN ({compliant})), MAX(timestamp)
+            FROM results WHERE id > ? AND id <= ? GROUP BY policy
+            ON CONFLICT(policy) DO UPDATE SET total = total + excluded.total,
+            compliant = compliant + excluded.compliant, last_seen = MAX(last_seen, excluded.last_seen)""",
+        UNASSESSED_STATUSES + COMPLIANT_STATUSES + (rendered_upto, max_id))
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('rendered_upto', ?)", (str(max_id),))
+
+
+def _rate(compliant, total):
+    return f"{compliant / total * 100:.1f}%" if total else "N/A"
+
+
+def render_dashboard(output_path, fmt="html", db_path=None):
+    """Renders the fleet dashboard from the incrementally maintained summary tables."""
+    with closing(connect(db_path)) as conn, conn:
+        _fold_new_results(conn)
+        hosts = conn.execute("SELECT host, level, timestamp, compliant, total FROM host_latest ORDER BY host").fetchall()
+        policies = conn.execute("SELECT policy, compliant, total, last_seen FROM policy_summary ORDER BY policy").fetchall()
+        result_count = conn.execute("SELECT value FROM meta WHERE key = 'rendered_upto'").fetchone()
+
+    if fmt == "html":
+        esc = html.escape
+        host_rows = "\n".join(
+            f"<tr><td>{esc(h)}</td><td>{esc(l)}</td><td>{esc(t)}</td><td>{c}/{n}</td><td>{_rate(c, n)}</td></tr>"
+            for h, l, t, c, n in hosts)
+        policy_rows = "\n".join(
+            f"<tr><td>{esc(p)}</td><td>{c}</td><td>{n}</td><td>{_rate(c, n)}</td><td>{esc(t)}</td></tr>"
+            for p, c, n, t in policies)
+        template = HTML_TEMPLATE
+    else:
+        host_rows = "\n".join(f"| {h} | {l} | {t} | {c}/{n} | {_rate(c, n)} |" for h, l, t, c, n in hosts)
+        policy_rows = "\n".join(f"| {p} | {c} | {n} | {_rate(c, n)} | {t} |" for p, c, n, t in policies)
+        template = MARKDOWN_TEMPLATE
+
+    with open(output_path, 'w') as f:
+        f.write(template.substitute(
+            generated=datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            host_count=len(hosts),
+            result_count=result_count[0] if result_count else 0,
+            host_rows=host_rows,
+            policy_rows=policy_rows))
+
+    print(f"\nDashboard generated successfully at: {output_path}")
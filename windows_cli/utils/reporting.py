@@ -3,8 +3,14 @@
 import datetime
 import os
 
-def create_compliance_report(check_results, command, output_filename, level="strict"):
-    """Generates a detailed compliance report (TXT format)."""
+from utils.report_store import record_results
+
+def create_compliance_report(check_results, command, output_filename, level="strict", write_txt=True):
+    """Records results in the indexed report store and generates a detailed compliance report (TXT format)."""
+    record_results(check_results, command, level)
+    if not write_txt:
+        return
+
     output_path = os.path.join(os.getcwd(), output_filename)
     
     report_data = f"--- Protego Compliance Report: {command} ---\n"
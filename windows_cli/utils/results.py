@@ -0,0 +1,51 @@
+# PROTEGO_WINDOWS/utils/results.py
+
+import sys
+from enum import Enum
+
+
+class Status(str, Enum):
+    """Result status. Subclasses str so existing comparisons like status == 'COMPLIANT' keep working."""
+    COMPLIANT = 'COMPLIANT'
+    NON_COMPLIANT = 'NON-COMPLIANT'
+    NOT_ASSESSED = 'NOT-ASSESSED'
+
+    def __str__(self):
+        return self.value
+
+
+class ComplianceResult:
+    """One policy result. Uses __slots__ and interned policy names to keep fleet-sized result sets small.
+
+    Supports the read-only dict protocol (result['policy'], result.get('status'), dict(result))
+    so callers written against the old per-result dicts, like utils/reporting, work unchanged.
+    """
+    __slots__ = ('policy', 'status', 'current', 'target', 'previous')
+    FIELDS = __slots__
+
+    def __init__(self, policy, status, current="N/A", target="N/A", previous="N/A"):
+        self.policy = sys.intern(policy)
+        self.status = Status(status)
+        self.current = current
+        self.target = target
+        self.previous = previous
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+    def __repr__(self):
+        return f"ComplianceResult({self.policy!r}, {self.status.value!r}, current={self.current!r}, target={self.target!r})"
@@ -0,0 +1,22 @@
+# PROTEGO_WINDOWS/utils/state.py
+
+import os
+import json
+
+STATE_FILE = os.path.join(os.getcwd(), "backups", "protego_state.json")
+
+def load_state():
+    """Loads persisted engine state (e.g. the last applied baseline). Returns {} if none exists."""
+    try:
+        with open(STATE_FILE, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_state(state):
+    """Writes engine state atomically so an interrupted write never leaves a corrupt file."""
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    temp_path = STATE_FILE + ".tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_path, STATE_FILE)
@@ -1,47 +1,128 @@
 # PROTEGO_WINDOWS/win_configs.py
 
-strong_configs = {
-    # 1. Account Policies 
-    "account_policy": [
-        "PasswordHistorySize", 
-        "MaximumPasswordAge", 
-        "MinimumPasswordLength", 
-        "LockoutBadCount"
-    ],
-    # 4.b. System Services 
-    "service_control": [
-        "RemoteRegistry", 
-        "bthserv", 
-        "Browser",
-        "SharedAccess"
-    ],
-    # 5. Firewall 
-    "firewall": [
-        "private_state", 
-        "public_state",
-        "inbound_default"
-    ],
-    # 3. Security Options (Rename)
-    "account_name": [
-        "Administrator_Rename"
-    ]
-}
+from win_flags import win_flags
+
+# Each baseline lists only the policies it adds on top of the baseline it extends.
+# strict extends medium extends easy; custom baselines can extend any of them.
+BASELINES = {
+    "easy": {
+        "extends": None,
+        "policies": {
+            "account_policy": [
+                "MinimumPasswordLength"
+            ]
+        }
+    },
+    "medium": {
+        "extends": "easy",
+        "policies": {
+            "account_policy": [
+                "LockoutBadCount"
+            ],
+            "service_control": [
+                "RemoteRegistry"
+            ],
+            "firewall": [
+                "private_state"
+            ],
+        }
+    },
+    "strict": {
+        "extends": "medium",
+        "policies": {
+            # 1. Account Policies
+            "account_policy": [
+                "PasswordHistorySize",
+                "MaximumPasswordAge"
+            ],
+            # 4.b. System Services
+            "service_control": [
+                "bthserv",
+                "Browser",
+                "SharedAccess"
+            ],
+            # 5. Firewall
+            "firewall": [
+                "public_state",
+                "inbound_default"
+            ],
+            # 3. Security Options (Rename)
+            "account_name": [
+                "Administrator_Rename"
+            ]
+        }
+    },
 
-medium_configs = {
-    "account_policy": [
-        "MinimumPasswordLength", 
-        "LockoutBadCount"
-    ],
-    "service_control": [
-        "RemoteRegistry"
-    ],
-    "firewall": [
-        "private_state"
-    ],
+    # --- Custom baselines ---
+    "cis_l1": {
+        "extends": "medium",
+        "policies": {
+            "account_policy": [
+                "PasswordHistorySize"
+            ],
+            "firewall": [
+                "public_state",
+                "inbound_default"
+            ]
+        }
+    },
+    "cis_l2": {
+        "extends": "cis_l1",
+        "policies": {
+            "service_control": [
+                "bthserv",
+                "SharedAccess"
+            ],
+            "account_name": [
+                "Administrator_Rename"
+            ]
+        }
+    },
+    "org": {
+        "extends": "cis_l1",
+        "policies": {
+            "service_control": [
+                "bthserv"
+            ]
+        }
+    },
 }
 
-easy_configs = {
-    "account_policy": [
-        "MinimumPasswordLength"
-    ]
-}
\ No newline at end of file
+
+def resolve_baseline(name, _seen=None):
+    """Flattens a baseline and everything it extends into a {category: [policies]} config.
+
+    Policies missing from the win_flags catalog are dropped: they can never be applied or
+    verified, so keeping them would make every delta against the level non-empty.
+    """
+    if name not in BASELINES:
+        raise ValueError(f"Unknown baseline '{name}'.")
+    _seen = _seen or []
+    if name in _seen:
+        raise ValueError(f"Baseline inheritance cycle: {' -> '.join(_seen + [name])}")
+
+    baseline = BASELINES[name]
+    config = resolve_baseline(baseline["extends"], _seen + [name]) if baseline["extends"] else {}
+    for category, policies in baseline["policies"].items():
+        known = [p for p in policies if p in win_flags.get(category, {})]
+        if not known:
+            continue
+        merged = config.setdefault(category, [])
+        merged.extend(p for p in known if p not in merged)
+    return config
+
+
+def compute_delta(applied_config, target_config):
+    """Returns the policies in target_config that applied_config does not already cover."""
+    delta = {}
+    for category, policies in target_config.items():
+        already = set(applied_config.get(category, []))
+        missing = [p for p in policies if p not in already]
+        if missing:
+            delta[category] = missing
+    return delta
+
+
+easy_configs = resolve_baseline("easy")
+medium_configs = resolve_baseline("medium")
+strong_configs = resolve_baseline("strict")
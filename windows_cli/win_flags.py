@@ -8,18 +8,21 @@ win_flags = { # Renamed to lowercase 'win_flags' for convention
         "MinimumPasswordLength": {
             "value": "unknown", 
             "target_value": "12",
+            "check": "value >= 12",
             "check_type": "INF_PARSE",
             "section": "System Access"
         },
         "LockoutBadCount": {
             "value": "unknown",
             "target_value": "5",
+            "check": "value in 1..5",
             "check_type": "INF_PARSE",
             "section": "System Access"
         },
         "PasswordHistorySize": {
             "value": "unknown",
             "target_value": "24",
+            "check": "value >= 24",
             "check_type": "INF_PARSE",
             "section": "System Access"
         },
@@ -30,6 +33,7 @@ win_flags = { # Renamed to lowercase 'win_flags' for convention
         "RemoteRegistry": {
             "value": "unknown",
             "target_value": "4", 
+            "check": "value == 4",
             "check_type": "SC_QUERY",
             "get_command": 'sc qc "RemoteRegistry"', 
             "set_command": 'sc config "RemoteRegistry" start= disabled',
@@ -37,6 +41,7 @@ win_flags = { # Renamed to lowercase 'win_flags' for convention
         "bthserv": {
             "value": "unknown",
             "target_value": "4",
+            "check": "value == 4",
             "check_type": "SC_QUERY",
             "get_command": 'sc qc "bthserv"',
             "set_command": 'sc config "bthserv" start= disabled',
@@ -44,6 +49,7 @@ win_flags = { # Renamed to lowercase 'win_flags' for convention
         "SharedAccess": {
             "value": "unknown",
             "target_value": "4",
+            "check": "value == 4",
             "check_type": "SC_QUERY",
             "get_command": 'sc qc "SharedAccess"',
             "set_command": 'sc config "SharedAccess" start= disabled',
@@ -55,6 +61,7 @@ win_flags = { # Renamed to lowercase 'win_flags' for convention
         "private_state": {
             "value": "unknown",
             "target_value": "ON",
+            "check": r'output matches "State\s+ON"',
             "check_type": "NETSH_FW",
             "get_command": 'netsh advfirewall show privateprofile state | findstr /I "State"',
             "set_command": 'netsh advfirewall set privateprofile state on',
@@ -62,6 +69,8 @@ win_flags = { # Renamed to lowercase 'win_flags' for convention
         "inbound_default": {
             "value": "unknown",
             "target_value": "BlockInboundDefault",
+            # One 'Firewall Policy' line per profile; every profile must block inbound
+            "check": 'output matches "BlockInbound" and not (output matches "AllowInbound")',
             "check_type": "NETSH_FW",
             "get_command": 'netsh advfirewall show allprofiles firewallpolicy | findstr /I "Inbound Default"',
             "set_command": 'netsh advfirewall set allprofiles firewallpolicy blockinbound,allowoutbound',
@@ -73,6 +82,9 @@ win_flags = { # Renamed to lowercase 'win_flags' for convention
         "Administrator_Rename": {
             "value": "Administrator", 
             "target_value": "ProtegoAdmin",
+            # Only a definite "no such user" (NET HELPMSG 2221) counts as renamed; any other failure
+            # (not elevated, net.exe missing, probe not run) must not pass
+            "check": 'not ok and output matches "user name could not be found|HELPMSG 2221"',
             "check_type": "NET_USER",
             "get_command": 'net user Administrator', 
             "set_command": 'net user Administrator ProtegoAdmin',
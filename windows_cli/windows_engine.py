@@ -4,6 +4,7 @@ import subprocess
 import os
 import re
 import datetime
+import fnmatch
 import sys
 
 # Ensure utilities are accessible
@@ -12,14 +13,22 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'utils'))
 from win_flags import win_flags, SECEDIT_EXPORT_COMMAND
 from utils.rollback import backup_windows_state, rollback_windows_state
 from utils.reporting import create_compliance_report
+from utils.results import ComplianceResult, Status
+from utils.inf_compiler import compile_inf, compile_sdb
+from utils.offline_audit import iter_inf_entries
+from utils.check_dsl import compile_check, check_expression
+from utils.state import load_state, save_state
+from win_configs import compute_delta
 
 class WindowsEngine:
-    def __init__(self, target_config, level="strict"):
+    def __init__(self, target_config, level="strict", reuse_sdb=False, write_txt=True):
         self.target_config = target_config 
         self.level = level
         self.results = []
         self.backup_path = None
-        self.INF_FILENAME = "protego_harden.inf"
+        self.reuse_sdb = reuse_sdb
+        self.write_txt = write_txt
+        self._state = None  # Persisted state of the harden run in progress (for checkpointing)
 
     def __run_cli(self, command, verbose=True):
         """Helper to execute Windows CLI commands and returns success/output."""
@@ -36,82 +45,246 @@ class WindowsEngine:
         except FileNotFoundError:
             return False, "Command not found."
 
-    def check_compliance(self):
-        """Checks current state against target policies."""
-        self.results = []
+    def probe_policies(self, entries, extra_inf_keys=()):
+        """Probes each (policy_name, flag_data) pair with the fewest commands.
+
+        Returns {policy_name: context} where context holds the check DSL sources:
+        'value', 'output', 'ok' and 'inf' (every secedit value that was read).
+        The secedit export runs at most once and is only scanned until every requested
+        INF key is found; each distinct get_command runs at most once.
+        """
+        contexts = {}
         temp_export_inf = "temp_export.inf"
         
-        print("-> Executing Windows Compliance Check...")
-        self.__run_cli(SECEDIT_EXPORT_COMMAND, verbose=False) 
+        inf_keys = set(extra_inf_keys)
+        for policy_name, flag_data in entries:
+            if flag_data.get('check_type') == "INF_PARSE":
+                inf_keys.add((flag_data.get('section', "System Access"), flag_data.get('key', policy_name)))
+
+        found = {}
+        if inf_keys:
+            self.__run_cli(SECEDIT_EXPORT_COMMAND, verbose=False) 
+            try:
+                for section, key, value in iter_inf_entries(temp_export_inf):
+                    if (section, key) in inf_keys and (section, key) not in found:
+                        found[(section, key)] = value
+                        if len(found) == len(inf_keys): break
+            except FileNotFoundError:
+                found = None
+            if os.path.exists(temp_export_inf): os.remove(temp_export_inf)
+
+        command_output = {}
+        for policy_name, flag_data in entries:
+            check_type = flag_data.get('check_type')
+            context = {'value': "N/A", 'output': "", 'ok': False, 'inf': found or {}}
+
+            if check_type == "INF_PARSE":
+                key = (flag_data.get('section', "System Access"), flag_data.get('key', policy_name))
+                if found is None:
+                    context['value'] = "INF File Missing"
+                elif key in found:
+                    context.update(value=found[key], output=found[key], ok=True)
+                contexts[policy_name] = context
+                continue
+
+            command = flag_data.get("get_command")
+            if command and command not in command_output:
+                command_output[command] = self.__run_cli(command, verbose=False)
+            success, output = command_output.get(command, (False, ""))
+            context.update(output=output, ok=success)
+
+            # --- LIVE VALUE READING LOGIC ---
+            if check_type == "SC_QUERY":
+                if success:
+                    match = re.search(r'START_TYPE\s+:\s+(\d+)', output)
+                    if match: context['value'] = match.group(1) 
+            
+            elif check_type == "NETSH_FW":
+                if success:
+                    context['value'] = " ".join(output.split()) or "N/A"
+
+            elif check_type == "NET_USER":
+                # The original account name still resolving means it has not been renamed
+                if success:
+                    context['value'] = flag_data.get('value')
+                elif re.search(r'user name could not be found|HELPMSG 2221', output, re.IGNORECASE):
+                    context['value'] = "Not found"
+
+            contexts[policy_name] = context
+        return contexts
+
+    def read_policies(self, entries):
+        """Reads the live value of each (policy_name, flag_data) pair. Returns {policy_name: value}."""
+        return {policy_name: context['value'] for policy_name, context in self.probe_policies(entries).items()}
+
+    def get_policies(self, patterns):
+        """Live-reads every catalog policy matching the names/glob patterns (e.g. 'Lockout*')."""
+        entries, records, unmatched = [], [], []
+        for pattern in patterns:
+            matched = False
+            for category, policies in win_flags.items():
+                for policy_name, flag_data in policies.items():
+                    if fnmatch.fnmatchcase(policy_name.lower(), pattern.lower()):
+                        matched = True
+                        if (policy_name, flag_data) not in entries:
+                            entries.append((policy_name, flag_data))
+                            records.append({'policy': policy_name, 'category': category})
+            if not matched:
+                unmatched.append(pattern)
+
+        current_values = self.read_policies(entries)
+        for record, (policy_name, flag_data) in zip(records, entries):
+            record['current'] = current_values.get(policy_name, "N/A")
+            record['target'] = flag_data.get('target_value', 'N/A')
+            record['check_type'] = flag_data.get('check_type', 'N/A')
+        return records, unmatched
+
+    def check_compliance(self, config=None):
+        """Checks current state against target policies (or only the policies in config)."""
+        self.results = []
         
-        for category, policies in self.target_config.items():
+        print("-> Executing Windows Compliance Check...")
+        entries = []
+        for category, policies in (config or self.target_config).items():
             for policy_name in policies:
                 flag_data = win_flags.get(category, {}).get(policy_name)
-                if not flag_data: continue
-
-                status = 'NON-COMPLIANT'
-                current_value = "N/A"
-                target_value = flag_data['target_value']
-                
-                # --- LIVE VALUE CHECKING LOGIC ---
-                if flag_data.get('check_type') == "INF_PARSE":
-                    try:
-                        with open(temp_export_inf, 'r') as f:
-                            for line in f:
-                                if line.strip().startswith(policy_name):
-                                    current_value = line.split('=')[-1].strip()
-                                    break
-                    except FileNotFoundError:
-                        current_value = "INF File Missing"
-                        
-                elif flag_data.get('check_type') == "SC_QUERY":
-                    success, output = self.__run_cli(flag_data["get_command"], verbose=False)
-                    if success:
-                        match = re.search(r'START_TYPE\s+:\s+(\d+)', output)
-                        if match: current_value = match.group(1) 
-                
-                elif flag_data.get('check_type') == "NETSH_FW":
-                    success, output = self.__run_cli(flag_data["get_command"], verbose=False)
-                    if success:
-                        if str(target_value).upper() in output.upper():
-                            current_value = target_value
-                        else:
-                            current_value = "INCORRECT SETTING"
-
-                if str(current_value).upper() == str(target_value).upper():
-                    status = 'COMPLIANT'
-
-                self.results.append({
-                    'policy': policy_name,
-                    'status': status,
-                    'current': current_value,
-                    'target': target_value
-                })
-        
-        if os.path.exists(temp_export_inf): os.remove(temp_export_inf)
+                if flag_data: entries.append((policy_name, flag_data))
+
+        # Check expressions are compiled once (and cached across calls) before any probing
+        evaluators, inf_keys = {}, set()
+        for policy_name, flag_data in entries:
+            try:
+                evaluators[policy_name] = compile_check(check_expression(flag_data))
+                inf_keys |= evaluators[policy_name].inf_keys
+            except ValueError as e:
+                print(f"[ERROR] {policy_name}: {e}")
+
+        contexts = self.probe_policies(entries, inf_keys)
+        for policy_name, flag_data in entries:
+            evaluator = evaluators.get(policy_name)
+            context = contexts[policy_name]
+            status = Status.COMPLIANT if evaluator and evaluator(context) else Status.NON_COMPLIANT
+            target_value = flag_data.get('check', flag_data['target_value'])
+            self.results.append(ComplianceResult(policy_name, status, context['value'], target_value))
         
-        create_compliance_report(self.results, "CHECK", f"Protego_Compliance_{self.level}_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.txt", self.level)
+        create_compliance_report(self.results, "CHECK", f"Protego_Compliance_{self.level}_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.txt", self.level, self.write_txt)
         return self.results
 
-    def harden_system(self):
-        """Applies all policies defined in the target config."""
+    def _is_done(self, step):
+        return bool(self._state) and step in self._state['harden_run']['completed']
+
+    def _checkpoint(self, step):
+        """Records a finished step so an interrupted run can resume after it."""
+        if self._state:
+            self._state['harden_run']['completed'].append(step)
+            save_state(self._state)
+
+    def harden_system(self, full=False, resume=False):
+        """Applies the policies in the target config that the last applied baseline does not cover.
+
+        Progress is checkpointed to the state file after every policy; with resume=True an
+        interrupted run for the same level continues after its last completed step. A pending
+        interrupted run is never silently replaced: starting another run requires full=True.
+        """
+        self.results = []  # an early return must not leave the results of an earlier check behind
+        state = load_state()
+        last_applied = state.get('last_applied')
+        interrupted = state.get('harden_run')
+
+        if resume and interrupted and interrupted['level'] == self.level:
+            print(f"\n-> Resuming interrupted {self.level} hardening ({len(interrupted['completed'])} step(s) already done).")
+            self._state = state
+            self._harden(interrupted['apply_config'], interrupted['inf_label'])
+            return
+        if interrupted and not full:
+            done = len(interrupted['completed'])
+            print(f"\n-> An interrupted {interrupted['level']} hardening run is pending ({done} step(s) done).")
+            if interrupted['level'] == self.level:
+                print("   Use --resume to continue it, or --full to discard it and re-apply every policy.")
+            else:
+                print(f"   Resume it with 'harden --level {interrupted['level']} --resume', "
+                      f"or use --full to discard it and apply {self.level} in full.")
+            return
+        if interrupted:
+            print(f"\n-> Discarding the interrupted {interrupted['level']} hardening run (--full).")
+        elif resume:
+            print(f"\n-> No interrupted {self.level} hardening run found. Starting a new run.")
+
+        if full or not last_applied:
+            apply_config = self.target_config
+            inf_label = self.level
+        else:
+            apply_config = compute_delta(last_applied['policies'], self.target_config)
+            inf_label = f"{last_applied['level']}_to_{self.level}"
+            print(f"\n-> Last applied baseline: {last_applied['level']}. Applying only the delta to {self.level}.")
+            if not apply_config:
+                print("   Nothing to apply; all policies in this level are already applied. Use --full to re-apply.")
+                return
+
+        state['harden_run'] = {
+            'level': self.level,
+            'apply_config': apply_config,
+            'inf_label': inf_label,
+            'backup_path': None,
+            'completed': []
+        }
+        save_state(state)
+        self._state = state
+        self._harden(apply_config, inf_label)
+
+    def _harden(self, apply_config, inf_label):
+        """Runs (or resumes) the checkpointed backup/apply/verify sequence for one harden run."""
+        run = self._state['harden_run']
+
         print("\n-> 1. Backing up system state...")
-        self.backup_path = backup_windows_state()
-        if not self.backup_path:
-             print("Hardening aborted due to critical backup failure.")
-             return
+        if self._is_done("backup"):
+            self.backup_path = run['backup_path']
+            print(f"   Reusing backup from the interrupted run: {os.path.basename(self.backup_path)}")
+        else:
+            self.backup_path = backup_windows_state()
+            if not self.backup_path:
+                 print("Hardening aborted due to critical backup failure.")
+                 self._state = None
+                 return
+            run['backup_path'] = self.backup_path
+            self._checkpoint("backup")
         self.results = []
         
         print("\n-> 2. Applying Hardening Policies...")
-        self._configure_services()
-        self._apply_secedit_policies()
-        self._configure_firewall()
-        self._perform_other_actions()
+        self._configure_services(apply_config)
+        self._apply_secedit_policies(apply_config, inf_label)
+        self._configure_firewall(apply_config)
+        self._perform_other_actions(apply_config)
         
         print("\n-> 3. Verifying final compliance state...")
-        self.check_compliance() 
+        self.check_compliance(apply_config) 
         
-        create_compliance_report(self.results, "HARDEN", f"Protego_Remediation_{self.level}_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.txt", self.level)
+        create_compliance_report(self.results, "HARDEN", f"Protego_Remediation_{self.level}_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.txt", self.level, self.write_txt)
+
+        state = self._state
+        self._state = None
+        state.pop('harden_run', None)
+        state['last_applied'] = {'level': self.level,
+                                 'policies': self._verified_policies(state.get('last_applied'), apply_config)}
+        save_state(state)
+
+    def _verified_policies(self, last_applied, apply_config):
+        """Merges the policies this run verified COMPLIANT into the previous record.
+
+        Policies that failed verification are left out (or dropped from the record) so the
+        next delta harden applies them again.
+        """
+        statuses = {result['policy']: result['status'] for result in self.results}
+        policies = {category: list(names) for category, names in (last_applied or {}).get('policies', {}).items()}
+        for category, names in apply_config.items():
+            recorded = policies.setdefault(category, [])
+            for policy_name in names:
+                compliant = statuses.get(policy_name) == Status.COMPLIANT
+                if compliant and policy_name not in recorded:
+                    recorded.append(policy_name)
+                elif not compliant and policy_name in recorded:
+                    recorded.remove(policy_name)
+        return {category: names for category, names in policies.items() if names}
 
     def rollback(self):
         """Reverts to the last backed-up state."""
@@ -122,78 +295,86 @@ class WindowsEngine:
             
         if self.backup_path:
             rollback_windows_state(self.backup_path)
+            # The rolled-back system no longer matches any applied baseline
+            state = load_state()
+            state.pop('last_applied', None)
+            save_state(state)
         else:
             print("No previous backup found to rollback.")
 
     
-    def _apply_secedit_policies(self):
-        """Generates INF file and executes secedit /configure."""
+    def _apply_secedit_policies(self, config, inf_label):
+        """Applies the cached INF template for config via secedit /configure."""
         print("   - Configuring Account/Local/Security Options via secedit...")
+        if self._is_done("secedit"):
+            print("     -> Already applied in the interrupted run.")
+            return
         
-        inf_path = os.path.join(os.getcwd(), self.INF_FILENAME)
-        temp_sdb_path = os.path.join(os.getcwd(), 'temp.sdb')
-        
-        # CRITICAL FIX: INF FILE GENERATION (UTF-16 encoding, no quotes for numeric values)
+        # The template is compiled once per (level, catalog content) and reused across runs
         try:
-            # CRITICAL FIX: Use UTF-16 encoding AND enforce Windows-style \r\n line endings
-            with open(inf_path, 'w', encoding='utf-16', newline='\r\n') as f:
-                # 1. System Access Section (Account Policies)
-                account_policies = self.target_config.get("account_policy", [])
-                if account_policies:
-                    f.write("[System Access]\n")
-                    
-                    for policy_name in account_policies:
-                        flag_data = win_flags.get("account_policy", {}).get(policy_name)
-                        if flag_data:
-                             # Write PolicyName = Value (Value is raw number, no quotes)
-                             f.write(f"{policy_name} = {flag_data['target_value']}\n")
-                             
+            inf_path = compile_inf(config, inf_label)
         except IOError as e:
             print(f"     -> FATAL ERROR: Could not write INF file: {e}")
             return
+        if not inf_path:
+            print("     -> No secedit policies in this level.")
+            return
+
+        sdb_path = compile_sdb(inf_path) if self.reuse_sdb else None
+        if sdb_path:
+            command = f'secedit /configure /db "{sdb_path}" /quiet'
+        else:
+            temp_sdb_path = os.path.join(os.getcwd(), 'temp.sdb')
+            command = f'secedit /configure /cfg "{inf_path}" /db "{temp_sdb_path}" /overwrite /quiet'
             
         # --- SECEDIT EXECUTION ---
-        success, output = self.__run_cli(
-            f'secedit /configure /cfg "{inf_path}" /db "{temp_sdb_path}" /overwrite /quiet',
-            verbose=False
-        )
+        success, output = self.__run_cli(command, verbose=False)
         
         print(f"     -> SECEDIT execution status: {'Success' if success else 'Failure'}")
         if not success:
-            print(f"     -> FAILED COMMAND: secedit /configure /cfg \"{inf_path}\" /db \"{temp_sdb_path}\" /overwrite /quiet")
+            print(f"     -> FAILED COMMAND: {command}")
             print("     -> SECEDIT ERROR DETAIL (FULL OUTPUT):")
             print(output) 
 
-        # --- Cleanup ---
-        if os.path.exists(inf_path): 
-            os.remove(inf_path)
-        if os.path.exists(temp_sdb_path):
+        # --- Cleanup (the cached template and compiled .sdb are kept) ---
+        if not sdb_path and os.path.exists(temp_sdb_path):
              os.remove(temp_sdb_path)
+        # A failed configure is left unchecked so --resume retries it
+        if success:
+            self._checkpoint("secedit")
 
 
-    def _configure_services(self):
+    def _configure_services(self, config):
         """Disables/enables services using sc.exe."""
         print("   - Disabling System Services (4.b)...")
-        for service_name in self.target_config.get("service_control", []):
+        for service_name in config.get("service_control", []):
+            if self._is_done(f"service_control:{service_name}"): continue
             flag_data = win_flags.get("service_control", {}).get(service_name)
             if flag_data and flag_data.get('set_command'):
                 success, _ = self.__run_cli(flag_data['set_command'], verbose=False)
                 print(f"     -> {service_name}: {'Disabled' if success else 'Failed'}")
+                if success: self._checkpoint(f"service_control:{service_name}")
 
-    def _configure_firewall(self):
+    def _configure_firewall(self, config):
         """Configures firewall profiles using netsh."""
         print("   - Configuring Windows Firewall (5)...")
-        for policy_name in self.target_config.get("firewall", []):
+        for policy_name in config.get("firewall", []):
+            if self._is_done(f"firewall:{policy_name}"): continue
             flag_data = win_flags.get("firewall", {}).get(policy_name)
             if flag_data and flag_data.get('set_command'):
-                self.__run_cli(flag_data['set_command'], verbose=False)
+                success, _ = self.__run_cli(flag_data['set_command'], verbose=False)
+                if success: self._checkpoint(f"firewall:{policy_name}")
+                else: print(f"     -> {policy_name}: Failed")
         
         print("     -> Firewall profile settings applied.")
 
-    def _perform_other_actions(self):
+    def _perform_other_actions(self, config):
         """Handles unique actions like renaming accounts (net user)."""
         print("   - Performing Other Account Actions...")
-        flag_data = win_flags.get("account_name", {}).get("Administrator_Rename")
-        if flag_data and flag_data.get('set_command'):
-            success, _ = self.__run_cli(flag_data['set_command'], verbose=False)
-            print(f"     -> Rename Admin: {'Success' if success else 'Failure'}")
\ No newline at end of file
+        for policy_name in config.get("account_name", []):
+            if self._is_done(f"account_name:{policy_name}"): continue
+            flag_data = win_flags.get("account_name", {}).get(policy_name)
+            if flag_data and flag_data.get('set_command'):
+                success, _ = self.__run_cli(flag_data['set_command'], verbose=False)
+                print(f"     -> {policy_name}: {'Success' if success else 'Failure'}")
+                if success: self._checkpoint(f"account_name:{policy_name}")
\ No newline at end of file